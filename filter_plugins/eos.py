@@ -10,28 +10,83 @@ __metaclass__ = type
 
 import re
 
+from ansible.module_utils.six import string_types
+
 
 INTERFACE_NAMES = {
     'Et': 'Ethernet',
+    'Eth': 'Ethernet',
     'Ma': 'Management',
+    'Mgmt': 'Management',
     'Vl': 'Vlan',
-    'Po': 'PortChannel'
+    'Po': 'Port-Channel',
+    'Lo': 'Loopback',
+    'Tu': 'Tunnel',
+    'Vx': 'Vxlan',
+    'Rc': 'Recirc-Channel',
 }
 
+# abbreviations and full names in any case, mapped to the full name
+_PREFIXES = dict((name.lower(), full) for name, full in INTERFACE_NAMES.items())
+_PREFIXES.update((full.lower(), full) for full in INTERFACE_NAMES.values())
+
+# <type><slot>[/<module>][/<port>][.<subinterface>], for instance Et3/1/2.100
+INTERFACE_RE = re.compile(r'^([a-zA-Z][a-zA-Z-]*?)\s*(\d+(?:/\d+)*(?:\.\d+)?)$')
+
+_EXPANDED = dict()
+_EXPANDED_MAXSIZE = 65536
+
 
 def expand_interface_name(name):
-    match = re.match('([a-zA-Z]*)', name)
-    if match and match.group(1) in INTERFACE_NAMES:
-        matched = match.group(1)
-        name = name.replace(matched, INTERFACE_NAMES[matched])
-    return name
+    try:
+        return _EXPANDED[name]
+    except (KeyError, TypeError):
+        pass
+
+    expanded = name
+    match = INTERFACE_RE.match(name)
+    if match:
+        prefix = _PREFIXES.get(match.group(1).lower())
+        if prefix:
+            expanded = prefix + match.group(2)
+
+    if len(_EXPANDED) >= _EXPANDED_MAXSIZE:
+        _EXPANDED.clear()
+    _EXPANDED[name] = expanded
+    return expanded
+
+
+def expand_interface_names(value, key=None):
+    """ Expands every interface name in a list or dict in one call
+
+    A list of names returns the list of expanded names and a dict returns
+    the dict with its keys expanded.  With key, value is a list of dicts and
+    the name found under key in each dict is expanded.
+    """
+    if isinstance(value, string_types):
+        return expand_interface_name(value)
+
+    if isinstance(value, dict):
+        return dict((expand_interface_name(k), v) for k, v in value.items())
+
+    if key is not None:
+        items = list()
+        for item in value:
+            item = dict(item)
+            if isinstance(item.get(key), string_types):
+                item[key] = expand_interface_name(item[key])
+            items.append(item)
+        return items
+
+    return [expand_interface_name(name) for name in value]
 
 
 class FilterModule(object):
     """Filters for working with output from network devices"""
 
     filter_map = {
-        'expand_interface_name': expand_interface_name
+        'expand_interface_name': expand_interface_name,
+        'expand_interface_names': expand_interface_names
     }
 
     def filters(self):
@@ -0,0 +1,174 @@
+#!/usr/bin/python
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'network'}
+
+
+DOCUMENTATION = """
+---
+module: eos_backup
+version_added: "2.7"
+author: "Peter Sprygada (@privateip)"
+short_description: Back up the configuration of Arista EOS devices
+description:
+  - This module retrieves the configuration of an Arista EOS device and
+    writes it straight to a local content addressed backup store.  Each
+    distinct configuration is stored once, gzip compressed, and a backup
+    identical to the previous backup of the host is not recorded again.
+    The configuration is not returned or parsed.
+options:
+  dest:
+    description:
+      - The directory of the backup store
+    required: true
+    type: path
+  name:
+    description:
+      - The name the backups of the device are recorded under, usually the
+        inventory hostname.  Required unless C(devices) is set.
+    required: false
+    default: null
+  source:
+    description:
+      - The configuration to back up
+    default: running
+    choices:
+      - running
+      - startup
+  deltas:
+    description:
+      - Stores a configuration as the compressed difference against a full
+        base configuration of the same host instead of a full copy.  A new
+        base is stored in full when the difference grows larger than half
+        of the configuration.
+    type: bool
+    default: false
+  eapi:
+    description:
+      - Connects to the device using the Arista eAPI (JSON-RPC over HTTP)
+        transport instead of the network_cli persistent connection.
+    required: false
+    default: null
+    type: dict
+  devices:
+    description:
+      - List of devices to back up over eAPI, each with the same suboptions
+        as C(eapi).  The backups are recorded under the device C(host).
+        At most C(concurrency) configurations are held in memory at once.
+    required: false
+    default: null
+    type: list
+  concurrency:
+    description:
+      - The number of C(devices) backed up at the same time
+    required: false
+    default: 10
+    type: int
+  timeout:
+    description:
+      - The number of seconds after which a device in C(devices) is
+        reported as failed
+    required: false
+    default: null
+    type: int
+"""
+
+EXAMPLES = """
+- name: back up the running configuration
+  eos_backup:
+    dest: /var/backups/eos
+    name: "{{ inventory_hostname }}"
+
+- name: back up many devices from a single task
+  eos_backup:
+    dest: /var/backups/eos
+    devices: "{{ eos_devices }}"
+    concurrency: 50
+  run_once: yes
+  delegate_to: localhost
+"""
+
+RETURN = """
+digest:
+  description: The SHA256 of the configuration
+  returned: when devices is not set
+  type: str
+base:
+  description: The digest of the configuration the backup is stored as a
+    delta against
+  returned: when the backup was stored as a delta
+  type: str
+stored:
+  description: True if the configuration was not found in the store
+  returned: when devices is not set
+  type: bool
+results:
+  description: The result for each device in devices
+  returned: when devices is set
+  type: list
+"""
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.connection import ConnectionError
+from ansible.module_utils._text import to_text
+from ansible.module_utils.eos import EapiConnection, get_connection, eapi_spec
+from ansible.module_utils.executor import DEFAULT_CONCURRENCY, run_devices
+from ansible.module_utils.backup import BackupStore, backup
+
+
+def main():
+    """ main entry point for module execution
+    """
+    argument_spec = dict(
+        dest=dict(type='path', required=True),
+        name=dict(),
+        source=dict(default='running', choices=['running', 'startup']),
+        deltas=dict(type='bool', default=False),
+
+        eapi=dict(type='dict', options=eapi_spec),
+        devices=dict(type='list', elements='dict', options=eapi_spec),
+        concurrency=dict(type='int', default=DEFAULT_CONCURRENCY),
+        timeout=dict(type='int')
+    )
+
+    module = AnsibleModule(argument_spec=argument_spec,
+                           required_one_of=[['name', 'devices']],
+                           mutually_exclusive=[['eapi', 'devices']],
+                           supports_check_mode=True)
+
+    store = BackupStore(module.params['dest'], module.params['deltas'])
+    source = module.params['source']
+
+    devices = module.params['devices']
+    if not devices:
+        try:
+            result = backup(get_connection(module), store, module.params['name'],
+                            source, module.check_mode)
+        except (ConnectionError, IOError, OSError) as exc:
+            module.fail_json(msg=to_text(exc))
+        module.exit_json(**result)
+
+    def run(device):
+        return backup(EapiConnection(**device), store, device['host'], source, module.check_mode)
+
+    run_devices(module, devices, run)
+
+
+if __name__ == '__main__':
+    main()
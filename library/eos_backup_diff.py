@@ -0,0 +1,149 @@
+#!/usr/bin/python
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'network'}
+
+
+DOCUMENTATION = """
+---
+module: eos_backup_diff
+version_added: "2.7"
+author: "Peter Sprygada (@privateip)"
+short_description: Compare and rebuild configurations from the backup store
+description:
+  - This module looks up the backups of a host recorded by C(eos_backup) at
+    two points in time, returns the difference between them and optionally
+    the configuration rebuilt at the later point.  It runs locally and does
+    not connect to the device.
+options:
+  dest:
+    description:
+      - The directory of the backup store
+    required: true
+    type: path
+  name:
+    description:
+      - The name the backups of the host are recorded under
+    required: true
+  before:
+    description:
+      - The point in time to compare from as an ISO 8601 UTC timestamp,
+        for instance C(2018-09-01T00:00:00Z).  Defaults to the backup
+        preceding C(after).
+    required: false
+    default: null
+  after:
+    description:
+      - The point in time to compare to as an ISO 8601 UTC timestamp.
+        Defaults to the latest backup.
+    required: false
+    default: null
+  return_config:
+    description:
+      - Also returns the configuration as it was at C(after)
+    type: bool
+    default: false
+"""
+
+EXAMPLES = """
+- name: show what changed since the start of the month
+  eos_backup_diff:
+    dest: /var/backups/eos
+    name: "{{ inventory_hostname }}"
+    before: 2018-09-01T00:00:00Z
+  delegate_to: localhost
+
+- name: rebuild the configuration as it was at a point in time
+  eos_backup_diff:
+    dest: /var/backups/eos
+    name: "{{ inventory_hostname }}"
+    after: 2018-09-01T00:00:00Z
+    return_config: yes
+  delegate_to: localhost
+"""
+
+RETURN = """
+before:
+  description: The digest of the backup compared from
+  returned: always
+  type: str
+after:
+  description: The digest of the backup compared to
+  returned: always
+  type: str
+diff:
+  description: The unified diff between the two backups
+  returned: always
+  type: str
+config:
+  description: The configuration at C(after)
+  returned: when return_config is true
+  type: str
+"""
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.backup import BackupStore
+
+
+def main():
+    """ main entry point for module execution
+    """
+    argument_spec = dict(
+        dest=dict(type='path', required=True),
+        name=dict(required=True),
+        before=dict(),
+        after=dict(),
+        return_config=dict(type='bool', default=False)
+    )
+
+    module = AnsibleModule(argument_spec=argument_spec,
+                           supports_check_mode=True)
+
+    store = BackupStore(module.params['dest'])
+    name = module.params['name']
+
+    history = store.history(name)
+    if not history:
+        module.fail_json(msg='no backups found for %s' % name)
+
+    if module.params['after']:
+        after = store.find(name, module.params['after'])
+    else:
+        after = history[-1][1]
+    if after is None:
+        module.fail_json(msg='no backup of %s at %s' % (name, module.params['after']))
+
+    if module.params['before']:
+        before = store.find(name, module.params['before'])
+    else:
+        digests = [digest for _, digest in history]
+        index = len(digests) - 1 - digests[::-1].index(after)
+        before = digests[index - 1] if index else None
+
+    result = {'changed': False, 'before': before, 'after': after, 'diff': ''}
+    if before and before != after:
+        result['diff'] = store.diff(before, after)
+
+    if module.params['return_config']:
+        result['config'] = store.read(after)
+
+    module.exit_json(**result)
+
+if __name__ == '__main__':
+    main()
@@ -47,6 +47,67 @@ options:
       - Configures the maximum equal cost paths to install
     type: int
     default: null
+  eapi:
+    description:
+      - Connects to the device using the Arista eAPI (JSON-RPC over HTTP)
+        transport instead of the network_cli persistent connection.  Show
+        commands and configuration sessions are sent as batched runCmds
+        requests over pooled keep-alive connections.
+    required: false
+    default: null
+    type: dict
+    suboptions:
+      host:
+        description:
+          - The hostname or address of the eAPI endpoint
+        required: true
+      port:
+        description:
+          - The port of the eAPI endpoint, defaults to 443 or 80 based on
+            the value of C(use_ssl)
+        type: int
+      username:
+        description:
+          - The username used to authenticate to eAPI
+      password:
+        description:
+          - The password used to authenticate to eAPI
+      use_ssl:
+        description:
+          - Connect to eAPI using HTTPS
+        type: bool
+        default: true
+      validate_certs:
+        description:
+          - Validate the device certificate when C(use_ssl) is enabled
+        type: bool
+        default: true
+      timeout:
+        description:
+          - The timeout in seconds for each eAPI request
+        type: int
+        default: 30
+  devices:
+    description:
+      - List of devices to configure concurrently over eAPI, each with the
+        same suboptions as C(eapi).  The same configuration is converged on
+        every device by a pool of C(concurrency) workers.
+    required: false
+    default: null
+    type: list
+  concurrency:
+    description:
+      - The number of C(devices) configured at the same time
+    required: false
+    default: 10
+    type: int
+  timeout:
+    description:
+      - The number of seconds after which a device in C(devices) is
+        reported as failed
+    required: false
+    default: null
+    type: int
   state:
     description:
       - Specifies the state of the BGP process configured  on the device
@@ -67,28 +128,26 @@ EXAMPLES = """
   eos_bgp:
     bgp_as: 65000
     state: absent
+
+- name: configure bgp on many devices concurrently
+  eos_bgp:
+    bgp_as: 65000
+    devices: "{{ eos_devices }}"
+    concurrency: 20
+  run_once: yes
 """
 
 RETURN = """
+results:
+  description: The result for each device in devices
+  returned: when devices is set
+  type: list
+  sample: [{"host": "leaf1", "failed": false, "changed": true, "commands": []}]
 """
 from ansible.module_utils.basic import AnsibleModule
-from ansible.module_utils.connection import Connection
-from ansible.module_utils.bgp import get_bgp_as
-
-
-def configure(module):
-    commands = list()
-
-    if module.params['router_id']:
-        commands.append('router-id %s' % module.params['router_id'])
-
-    if module.params['maximum_paths']:
-        commands.append('maximum-paths %s' % module.params['maximum_paths'])
-
-    if commands:
-        commands.insert(0, 'router bgp %s' % module.params['bgp_as'])
-
-    return commands
+from ansible.module_utils.eos import apply, get_connection, eapi_spec
+from ansible.module_utils.executor import DEFAULT_CONCURRENCY, run_devices
+from ansible.module_utils.bgp import bgp_commands, reconcile
 
 
 def main():
@@ -100,34 +159,32 @@ def main():
         router_id=dict(),
         maximum_paths=dict(type='int'),
 
+        eapi=dict(type='dict', options=eapi_spec),
+        devices=dict(type='list', elements='dict', options=eapi_spec),
+        concurrency=dict(type='int', default=DEFAULT_CONCURRENCY),
+        timeout=dict(type='int'),
+
         state=dict(default='present', choices=['present', 'absent'])
     )
 
     module = AnsibleModule(argument_spec=argument_spec,
+                           mutually_exclusive=[['eapi', 'devices']],
                            supports_check_mode=True)
 
-    connection = Connection(module._socket_path)
-    bgp_as = get_bgp_as(connection)
-
-    result = {'changed': False}
+    devices = module.params['devices']
+    if devices:
+        def run(device):
+            return reconcile(device, bgp_commands, module.params, module.check_mode)
 
-    commands = list()
+        run_devices(module, devices, run)
 
-    if module.params['state'] == 'absent':
-        commands.append('no router bgp %s' % module.params['bgp_as'])
+    connection = get_connection(module)
 
-    elif module.params['state'] == 'present':
-        if bgp_as and bgp_as != module.params['bgp_as']:
-            commands.append('no router bgp %s' % bgp_as)
-        commands.extend(configure(module))
+    commands = bgp_commands(connection, module.params)
 
-    if commands:
-        commit = not module.check_mode
-        resp = connection.load_config(commands, commit)
-        if resp.get('diff'):
-            result['changed'] = True
-            if module._diff:
-                result['diff'] = {'prepared': resp['diff']}
+    result = apply(connection, commands, module.check_mode)
+    if not module._diff:
+        result.pop('diff', None)
 
     module.exit_json(**result)
 
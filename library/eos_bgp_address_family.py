@@ -61,7 +61,74 @@ options:
         type: bool
         default: none
   replace:
-   state:
+    description:
+      - Removes the address family from the BGP process before configuring
+        it so only the provided neighbors are activated.
+    required: false
+    type: bool
+    default: null
+  eapi:
+    description:
+      - Connects to the device using the Arista eAPI (JSON-RPC over HTTP)
+        transport instead of the network_cli persistent connection.  Show
+        commands and configuration sessions are sent as batched runCmds
+        requests over pooled keep-alive connections.
+    required: false
+    default: null
+    type: dict
+    suboptions:
+      host:
+        description:
+          - The hostname or address of the eAPI endpoint
+        required: true
+      port:
+        description:
+          - The port of the eAPI endpoint, defaults to 443 or 80 based on
+            the value of C(use_ssl)
+        type: int
+      username:
+        description:
+          - The username used to authenticate to eAPI
+      password:
+        description:
+          - The password used to authenticate to eAPI
+      use_ssl:
+        description:
+          - Connect to eAPI using HTTPS
+        type: bool
+        default: true
+      validate_certs:
+        description:
+          - Validate the device certificate when C(use_ssl) is enabled
+        type: bool
+        default: true
+      timeout:
+        description:
+          - The timeout in seconds for each eAPI request
+        type: int
+        default: 30
+  devices:
+    description:
+      - List of devices to configure concurrently over eAPI, each with the
+        same suboptions as C(eapi).  The same configuration is converged on
+        every device by a pool of C(concurrency) workers.
+    required: false
+    default: null
+    type: list
+  concurrency:
+    description:
+      - The number of C(devices) configured at the same time
+    required: false
+    default: 10
+    type: int
+  timeout:
+    description:
+      - The number of seconds after which a device in C(devices) is
+        reported as failed
+    required: false
+    default: null
+    type: int
+  state:
     description:
       - Specifies the desired state of the address family within the global
         BGP routing process.
@@ -86,27 +153,29 @@ EXAMPLES = """
       - name: 10.1.1.1
         activate: yes
     replace: yes
+
+- name: activate evpn for LEAF on many devices concurrently
+  eos_bgp_address_family:
+    afi: evpn
+    neighbors:
+      - name: LEAF
+        activate: yes
+    devices: "{{ eos_devices }}"
+  run_once: yes
 """
 
 RETURN = """
+results:
+  description: The result for each device in devices
+  returned: when devices is set
+  type: list
+  sample: [{"host": "leaf1", "failed": false, "changed": true, "commands": []}]
 """
 from ansible.module_utils.basic import AnsibleModule
-from ansible.module_utils.connection import Connection
-from ansible.module_utils.bgp import get_bgp_as
-
-
-def configure(module):
-    commands = list()
-
-    for entry in module.params['neighbors']:
-        name = entry['name']
-
-        if entry['activate'] is True:
-            commands.append('neighbor %s activate' % name)
-        elif entry['activate'] is False:
-            commands.append('no neighbor %s activate' % name)
-
-    return commands
+from ansible.module_utils.eos import apply, get_connection, eapi_spec
+from ansible.module_utils.executor import DEFAULT_CONCURRENCY, run_devices
+from ansible.module_utils._text import to_text
+from ansible.module_utils.bgp import address_family_commands, reconcile
 
 
 def main():
@@ -124,47 +193,34 @@ def main():
         'neighbors': dict(type='list', elements='dict', options=neighbors_spec),
 
         'replace': dict(type='bool'),
+        'eapi': dict(type='dict', options=eapi_spec),
+        'devices': dict(type='list', elements='dict', options=eapi_spec),
+        'concurrency': dict(type='int', default=DEFAULT_CONCURRENCY),
+        'timeout': dict(type='int'),
         'state': dict(default='present', choices=['present', 'absent'])
     }
 
     module = AnsibleModule(argument_spec=argument_spec,
+                           mutually_exclusive=[['eapi', 'devices']],
                            supports_check_mode=True)
 
-    connection = Connection(module._socket_path)
-
-    bgp_as = get_bgp_as(connection)
-
-    if not bgp_as:
-        module.fail_json(msg='bgp not configured on this node')
-
-    result = {'changed': False}
-
-    commands = list()
-
-    if module.params['state'] == 'absent':
-        commands.extend([
-            'router bgp %s' % bgp_as,
-            'no address-family %s' % module.params['afi'],
-            'exit'
-        ])
+    devices = module.params['devices']
+    if devices:
+        def run(device):
+            return reconcile(device, address_family_commands, module.params, module.check_mode)
 
-    else:
-        commands.append('router bgp %s' % bgp_as)
+        run_devices(module, devices, run)
 
-        if module.params['replace']:
-            commands.append('no address-family %s' % module.params['afi'])
+    connection = get_connection(module)
 
-        commands.append('address-family %s' % module.params['afi'])
-        commands.extend(configure(module))
-        commands.append('exit')
+    try:
+        commands = address_family_commands(connection, module.params)
+    except ValueError as exc:
+        module.fail_json(msg=to_text(exc))
 
-    if commands:
-        commit = not module.check_mode
-        resp = connection.load_config(commands, commit)
-        if resp.get('diff'):
-            result['changed'] = True
-            if module._diff:
-                result['diff'] = {'prepared': resp['diff']}
+    result = apply(connection, commands, module.check_mode)
+    if not module._diff:
+        result.pop('diff', None)
 
     module.exit_json(**result)
 
@@ -32,8 +32,19 @@ description:
 options:
   name:
     description:
-      - The name of the peer group to manage in the active configuration
-    required: true
+      - The name of the peer group to manage in the active configuration.
+        This argument is mutually exclusive with C(aggregate)
+    required: false
+  aggregate:
+    description:
+      - The list of peer groups to manage.  Each item accepts the same
+        arguments as the module except C(aggregate) and C(eapi), values not
+        set on the item are inherited from the module arguments.  Neighbor
+        membership is compared across all of the groups against a single
+        read of the device configuration and the changes are committed in
+        one configuration session.
+    required: false
+    type: list
   remote_as:
     description:
       - The value for the BGP peer-group remote-as.
@@ -90,6 +101,80 @@ options:
     required: false
     default: null
     type: bool
+  batch_size:
+    description:
+      - Pushes the configuration in batches of at most this many commands
+        into a single configuration session which is committed once every
+        batch is loaded.  Use this when pushing very large neighbor changes
+        that would otherwise time out as a single request.  A failed batch
+        aborts the session so the change is never partially committed,
+        including with C(replace).  The number of batches is returned in
+        C(batches), the number loaded before a failure in C(loaded), and
+        progress is written to the module log.
+    required: false
+    default: null
+    type: int
+  eapi:
+    description:
+      - Connects to the device using the Arista eAPI (JSON-RPC over HTTP)
+        transport instead of the network_cli persistent connection.  Show
+        commands and configuration sessions are sent as batched runCmds
+        requests over pooled keep-alive connections.
+    required: false
+    default: null
+    type: dict
+    suboptions:
+      host:
+        description:
+          - The hostname or address of the eAPI endpoint
+        required: true
+      port:
+        description:
+          - The port of the eAPI endpoint, defaults to 443 or 80 based on
+            the value of C(use_ssl)
+        type: int
+      username:
+        description:
+          - The username used to authenticate to eAPI
+      password:
+        description:
+          - The password used to authenticate to eAPI
+      use_ssl:
+        description:
+          - Connect to eAPI using HTTPS
+        type: bool
+        default: true
+      validate_certs:
+        description:
+          - Validate the device certificate when C(use_ssl) is enabled
+        type: bool
+        default: true
+      timeout:
+        description:
+          - The timeout in seconds for each eAPI request
+        type: int
+        default: 30
+  devices:
+    description:
+      - List of devices to configure concurrently over eAPI, each with the
+        same suboptions as C(eapi).  The same configuration is converged on
+        every device by a pool of C(concurrency) workers.
+    required: false
+    default: null
+    type: list
+  concurrency:
+    description:
+      - The number of C(devices) configured at the same time
+    required: false
+    default: 10
+    type: int
+  timeout:
+    description:
+      - The number of seconds after which a device in C(devices) is
+        reported as failed
+    required: false
+    default: null
+    type: int
   state:
     description:
       - Specifies whether or not the peer-group is included in the the BGP
@@ -114,75 +199,64 @@ EXAMPLES = """
   eos_bgp_peer_group:
     name: LEAF
     state: absent
+
+- name: configure all peer groups in one pass
+  eos_bgp_peer_group:
+    aggregate:
+      - name: LEAF
+        remote_as: 65001
+        neighbors:
+          - 172.16.10.1
+          - 172.16.11.1
+      - name: SPINE
+        remote_as: 65000
+        neighbors:
+          - 172.16.0.1
+      - name: OLD
+        state: absent
+
+- name: configure a peer group on many devices concurrently
+  eos_bgp_peer_group:
+    name: LEAF
+    remote_as: 65001
+    devices: "{{ eos_devices }}"
+    concurrency: 20
+  run_once: yes
 """
 
 RETURN = """
+results:
+  description: The result for each device in devices
+  returned: when devices is set
+  type: list
+  sample: [{"host": "leaf1", "failed": false, "changed": true, "commands": []}]
 """
 from ansible.module_utils.basic import AnsibleModule
-from ansible.module_utils.connection import Connection
-from ansible.module_utils.bgp import get_bgp_as, get_bgp_peer_group_neighbors
-
-
-def configure(module, bgp_as, neighbors):
-    commands = list()
-
-    negate_on_none = module.params['negate_on_none']
-
-    def add(cmd):
-        return 'neighbor %s %s' % (module.params['name'], cmd)
-
-    def negate(cmd):
-        return 'no %s' % add(cmd)
-
-    if module.params['remote_as']:
-        commands.append(add('remote-as %s' % module.params['remote_as']))
-    elif negate_on_none:
-        commands.append(negate('remote-as'))
+from ansible.module_utils.eos import apply, get_connection, eapi_spec
+from ansible.module_utils.executor import DEFAULT_CONCURRENCY, run_devices
+from ansible.module_utils._text import to_text
+from ansible.module_utils.connection import ConnectionError
+from ansible.module_utils.bgp import peer_groups_commands, reconcile
 
-    if module.params['maximum_routes']:
-        commands.append(add('maximum-routes %s' % module.params['maximum_routes']))
-    elif negate_on_none:
-        commands.append(negate('maximum-routes'))
 
-    if module.params['next_hop_unchanged'] is True:
-        commands.append(add('next-hop-unchanged'))
-    elif module.params['next_hop_unchanged'] is False or negate_on_none:
-        commands.append(negate('next-hop_unchanged'))
+def map_params_to_obj(module, keys):
+    if not module.params['aggregate']:
+        return [dict((key, module.params[key]) for key in keys)]
 
-    if module.params['update_source']:
-        commands.append(add('update-source %s' % module.params['update_source']))
-    elif negate_on_none:
-        commands.append(negate('update-source'))
-
-    if module.params['ebgp_multihop'] is not None:
-        commands.append(add('ebgp-multihop %s' % module.params['ebgp_multihop']))
-    elif negate_on_none:
-        commands.append(negate('ebgp-multihop'))
-
-    if module.params['send_community_extended']:
-        commands.append(add('send-community extended'))
-    elif negate_on_none:
-        commands.append(negate('send-community extended'))
-
-    adds = set(module.params['neighbors']).difference(neighbors)
-    removes = set(neighbors).difference(module.params['neighbors'])
-
-    for item in adds:
-        commands.append('neighbor %s peer-group %s' % (item, module.params['name']))
-
-    for item in removes:
-        commands.append('no neighbor %s peer-group')
-
-    if commands:
-        commands.insert(0, 'router bgp %s' % bgp_as)
-
-    return commands
+    objs = list()
+    for item in module.params['aggregate']:
+        obj = dict(item)
+        for key in keys:
+            if obj.get(key) is None:
+                obj[key] = module.params[key]
+        objs.append(obj)
+    return objs
 
 
 def main():
     """ main entry point for module execution
     """
-    argument_spec = dict(
+    peer_group_spec = dict(
         name=dict(required=True),
 
         remote_as=dict(),
@@ -198,45 +272,60 @@ def main():
         replace=dict(type='bool'),
         negate_on_none=dict(type='bool'),
 
+        state=dict(choices=['present', 'absent'])
+    )
+
+    argument_spec = dict(peer_group_spec)
+    argument_spec.update(
+        name=dict(),
+        aggregate=dict(type='list', elements='dict', options=peer_group_spec),
+        batch_size=dict(type='int'),
+        eapi=dict(type='dict', options=eapi_spec),
+        devices=dict(type='list', elements='dict', options=eapi_spec),
+        concurrency=dict(type='int', default=DEFAULT_CONCURRENCY),
+        timeout=dict(type='int'),
         state=dict(default='present', choices=['present', 'absent'])
     )
 
+    required_one_of = [['name', 'aggregate']]
+    mutually_exclusive = [['name', 'aggregate'], ['eapi', 'devices']]
+
     module = AnsibleModule(argument_spec=argument_spec,
+                           required_one_of=required_one_of,
+                           mutually_exclusive=mutually_exclusive,
                            supports_check_mode=True)
 
-    connection = Connection(module._socket_path)
-
-    name = module.params['name']
+    groups = map_params_to_obj(module, peer_group_spec.keys())
 
-    bgp_as = get_bgp_as(connection)
-    neighbors = get_bgp_peer_group_neighbors(connection, name)
+    devices = module.params['devices']
+    if devices:
+        def run(device):
+            return reconcile(device, peer_groups_commands, groups, module.check_mode,
+                             module.params['batch_size'])
 
-    if not bgp_as:
-        module.fail_json(msg='bgp not configured on this node')
+        run_devices(module, devices, run)
 
-    result = {'changed': False}
+    connection = get_connection(module)
 
-    commands = list()
+    try:
+        commands = peer_groups_commands(connection, groups)
+    except ValueError as exc:
+        module.fail_json(msg=to_text(exc))
 
-    if module.params['state'] == 'absent':
-        commands.extend([
-            'router bgp %s' % bgp_as,
-            'no neighbor %s' % module.params['name'],
-            'exit'
-        ])
+    loaded = [0]
 
-    else:
-        if module.params['replace']:
-            commands.append('no neighbor %s' % module.params['name'])
-        commands.extend(configure(module, bgp_as, neighbors))
+    def progress(index, total):
+        loaded[0] = index
+        module.log('loaded batch %s of %s' % (index, total))
 
-    if commands:
-        commit = not module.check_mode
-        resp = connection.load_config(commands, commit)
-        if resp.get('diff'):
-            result['changed'] = True
-            if module._diff:
-                result['diff'] = {'prepared': resp['diff']}
+    try:
+        result = apply(connection, commands, module.check_mode,
+                       module.params['batch_size'], progress)
+    except ConnectionError as exc:
+        module.fail_json(msg='%s, the session was aborted and no batch was committed' % to_text(exc),
+                         loaded=loaded[0])
+    if not module._diff:
+        result.pop('diff', None)
 
     module.exit_json(**result)
 
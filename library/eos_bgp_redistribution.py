@@ -44,6 +44,67 @@ options:
         redistributed into BGP
     required: false
     default: null
+  eapi:
+    description:
+      - Connects to the device using the Arista eAPI (JSON-RPC over HTTP)
+        transport instead of the network_cli persistent connection.  Show
+        commands and configuration sessions are sent as batched runCmds
+        requests over pooled keep-alive connections.
+    required: false
+    default: null
+    type: dict
+    suboptions:
+      host:
+        description:
+          - The hostname or address of the eAPI endpoint
+        required: true
+      port:
+        description:
+          - The port of the eAPI endpoint, defaults to 443 or 80 based on
+            the value of C(use_ssl)
+        type: int
+      username:
+        description:
+          - The username used to authenticate to eAPI
+      password:
+        description:
+          - The password used to authenticate to eAPI
+      use_ssl:
+        description:
+          - Connect to eAPI using HTTPS
+        type: bool
+        default: true
+      validate_certs:
+        description:
+          - Validate the device certificate when C(use_ssl) is enabled
+        type: bool
+        default: true
+      timeout:
+        description:
+          - The timeout in seconds for each eAPI request
+        type: int
+        default: 30
+  devices:
+    description:
+      - List of devices to configure concurrently over eAPI, each with the
+        same suboptions as C(eapi).  The same configuration is converged on
+        every device by a pool of C(concurrency) workers.
+    required: false
+    default: null
+    type: list
+  concurrency:
+    description:
+      - The number of C(devices) configured at the same time
+    required: false
+    default: 10
+    type: int
+  timeout:
+    description:
+      - The number of seconds after which a device in C(devices) is
+        reported as failed
+    required: false
+    default: null
+    type: int
   state:
     description:
       - Specifies whether or not the named protocol should be redistributed
@@ -65,13 +126,26 @@ EXAMPLES = """
     protocol: static
     route_map: ROUTES
     state: present
+
+- name: redistribute connected routes on many devices concurrently
+  eos_bgp_redistribution:
+    protocol: connected
+    devices: "{{ eos_devices }}"
+  run_once: yes
 """
 
 RETURN = """
+results:
+  description: The result for each device in devices
+  returned: when devices is set
+  type: list
+  sample: [{"host": "leaf1", "failed": false, "changed": true, "commands": []}]
 """
 from ansible.module_utils.basic import AnsibleModule
-from ansible.module_utils.connection import Connection
-from ansible.module_utils.bgp import get_bgp_as
+from ansible.module_utils.eos import apply, get_connection, eapi_spec
+from ansible.module_utils.executor import DEFAULT_CONCURRENCY, run_devices
+from ansible.module_utils._text import to_text
+from ansible.module_utils.bgp import redistribution_commands, reconcile
 
 
 def main():
@@ -80,44 +154,34 @@ def main():
     argument_spec = dict(
         protocol=dict(required=True, choices=['connected', 'static']),
         route_map=dict(),
+        eapi=dict(type='dict', options=eapi_spec),
+        devices=dict(type='list', elements='dict', options=eapi_spec),
+        concurrency=dict(type='int', default=DEFAULT_CONCURRENCY),
+        timeout=dict(type='int'),
         state=dict(default='present', choices=['present', 'absent'])
     )
 
     module = AnsibleModule(argument_spec=argument_spec,
+                           mutually_exclusive=[['eapi', 'devices']],
                            supports_check_mode=True)
 
-    connection = Connection(module._socket_path)
-
-    bgp_as = get_bgp_as(connection)
-
-    result = {'changed': False}
-
-    commands = list()
-
-    if module.params['state'] == 'absent':
-        commands.extend([
-            'router bgp %s' % bgp_as,
-            'no redistribute %s' % module.params['protocol'],
-            'exit'
-        ])
-
-    elif module.params['state'] == 'present':
-        commands.extend([
-            'router bgp %s' % bgp_as,
-            'no redistribute %s' % module.params['protocol']
-        ])
-        cmd = 'redistribute %s' % module.params['protocol']
-        if module.params['route_map'] is not None:
-            cmd += ' route-map %s' % module.params['route_map']
-        commands.extend([cmd, 'exit'])
-
-    if commands:
-        commit = not module.check_mode
-        resp = connection.load_config(commands, commit)
-        if resp.get('diff'):
-            result['changed'] = True
-            if module._diff:
-                result['diff'] = {'prepared': resp['diff']}
+    devices = module.params['devices']
+    if devices:
+        def run(device):
+            return reconcile(device, redistribution_commands, module.params, module.check_mode)
+
+        run_devices(module, devices, run)
+
+    connection = get_connection(module)
+
+    try:
+        commands = redistribution_commands(connection, module.params)
+    except ValueError as exc:
+        module.fail_json(msg=to_text(exc))
+
+    result = apply(connection, commands, module.check_mode)
+    if not module._diff:
+        result.pop('diff', None)
 
     module.exit_json(**result)
 
@@ -31,7 +31,15 @@ description:
     the capabilities as Ansible facts.
 author:
   - Peter Sprygada (@privateip)
-options: {}
+options:
+  facts:
+    description:
+      - The C(arista_eos) facts already collected for the device.  They
+        are returned as C(arista_eos) with the keys collected by this module
+        replaced so the facts published by earlier tasks are kept.
+    required: false
+    default: null
+    type: dict
 """
 
 EXAMPLES = """
@@ -42,20 +50,24 @@ RETURN = """
 """
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.connection import Connection
+from ansible.module_utils.eos import get_capabilities, get_features
 
 def main():
     """ main entry point for Ansible module
     """
-    argument_spec = {}
+    argument_spec = {
+        'facts': dict(type='dict')
+    }
 
     module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
 
     connection = Connection(module._socket_path)
-    facts = connection.get_capabilities()
-    facts = module.from_json(facts)
+    facts = dict(module.params['facts'] or {})
+    facts.update(capabilities=get_capabilities(connection)['device_info'],
+                 features=get_features(connection))
     result = {
         'changed': False,
-        'ansible_facts': {'arista_eos': {'capabilities': facts['device_info']}}
+        'ansible_facts': {'arista_eos': facts}
     }
     module.exit_json(**result)
 
@@ -0,0 +1,172 @@
+#!/usr/bin/python
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'network'}
+
+
+DOCUMENTATION = """
+---
+module: eos_clear_sessions
+version_added: "2.7"
+author: "Peter Sprygada (@privateip)"
+short_description: Remove configuration sessions from Arista EOS devices
+description:
+  - This module lists the configuration sessions on an Arista EOS device
+    and removes the sessions matching all of the filters in a single batch
+    of commands.  Sessions currently opened by a CLI user are skipped.
+options:
+  name:
+    description:
+      - Regular expression the session name must match
+    required: false
+    default: null
+  state:
+    description:
+      - List of session states to remove
+    required: false
+    default: null
+    type: list
+    choices:
+      - pending
+      - completed
+      - aborted
+  older_than:
+    description:
+      - Only remove sessions created more than this number of seconds ago.
+        EOS does not report the age of a session so the age is read from
+        the name of the sessions created by Ansible, C(ansible_<seconds>)
+        (10 digits) or C(ansible_<milliseconds>) (13 digits), and other
+        sessions are never removed when this is set.
+    required: false
+    default: null
+    type: int
+  eapi:
+    description:
+      - Connects to the device using the Arista eAPI (JSON-RPC over HTTP)
+        transport instead of the network_cli persistent connection.
+    required: false
+    default: null
+    type: dict
+  devices:
+    description:
+      - List of devices to clear concurrently over eAPI, each with the same
+        suboptions as C(eapi).  The sessions of every device are cleared
+        by a pool of C(concurrency) workers.
+    required: false
+    default: null
+    type: list
+  concurrency:
+    description:
+      - The number of C(devices) cleared at the same time
+    required: false
+    default: 10
+    type: int
+  timeout:
+    description:
+      - The number of seconds after which a device in C(devices) is
+        reported as failed
+    required: false
+    default: null
+    type: int
+"""
+
+EXAMPLES = """
+- name: clear all configuration sessions
+  eos_clear_sessions:
+
+- name: clear pending sessions left by failed runs more than an hour ago
+  eos_clear_sessions:
+    state:
+      - pending
+    older_than: 3600
+
+- name: clear sessions on many devices concurrently
+  eos_clear_sessions:
+    name: ^ansible_
+    devices: "{{ eos_devices }}"
+    concurrency: 20
+  run_once: yes
+"""
+
+RETURN = """
+sessions:
+  description: The names of the sessions removed from the device
+  returned: when devices is not set
+  type: list
+  sample: ["ansible_1538000000000"]
+results:
+  description: The result for each device in devices
+  returned: when devices is set
+  type: list
+  sample: [{"host": "leaf1", "failed": false, "changed": false, "sessions": []}]
+"""
+import re
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.connection import ConnectionError
+from ansible.module_utils._text import to_text
+from ansible.module_utils.eos import EapiConnection, get_connection, eapi_spec, clear_sessions
+from ansible.module_utils.executor import DEFAULT_CONCURRENCY, run_devices
+
+
+def main():
+    """ main entry point for module execution
+    """
+    argument_spec = dict(
+        name=dict(),
+        state=dict(type='list', choices=['pending', 'completed', 'aborted']),
+        older_than=dict(type='int'),
+
+        eapi=dict(type='dict', options=eapi_spec),
+        devices=dict(type='list', elements='dict', options=eapi_spec),
+        concurrency=dict(type='int', default=DEFAULT_CONCURRENCY),
+        timeout=dict(type='int')
+    )
+
+    module = AnsibleModule(argument_spec=argument_spec,
+                           mutually_exclusive=[['eapi', 'devices']],
+                           supports_check_mode=True)
+
+    if module.params['name']:
+        try:
+            re.compile(module.params['name'])
+        except re.error as exc:
+            module.fail_json(msg='invalid name regex: %s' % to_text(exc))
+
+    filters = dict(name=module.params['name'], states=module.params['state'],
+                   older_than=module.params['older_than'], check_mode=module.check_mode)
+
+    devices = module.params['devices']
+    if not devices:
+        try:
+            sessions = clear_sessions(get_connection(module), **filters)
+        except ConnectionError as exc:
+            module.fail_json(msg=to_text(exc))
+        module.exit_json(changed=bool(sessions), sessions=sessions)
+
+    def run(device):
+        sessions = clear_sessions(EapiConnection(**device), **filters)
+        return {'changed': bool(sessions), 'sessions': sessions}
+
+    run_devices(module, devices, run)
+
+
+if __name__ == '__main__':
+    main()
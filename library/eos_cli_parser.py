@@ -0,0 +1,100 @@
+#!/usr/bin/python
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'network'}
+
+
+DOCUMENTATION = """
+---
+module: eos_cli_parser
+version_added: "2.7"
+author: "Peter Sprygada (@privateip)"
+short_description: Run a show command and parse it with a native parser
+description:
+  - This module runs a show command on an Arista EOS device and parses the
+    output using the native Python parser registered for one of the role
+    C(parser_templates/cli) templates.  The parsed facts are merged into
+    C(facts) and returned as the C(arista_eos) host fact, the same way a
+    template run by C(command_parser) extends it.  When no native parser is
+    registered for the template, the command is not run and no facts are
+    returned so the caller can fall back to the template.
+options:
+  command:
+    description:
+      - The show command to run on the device
+    required: true
+  parser:
+    description:
+      - The name of the C(parser_templates/cli) template the native parser
+        replaces, for instance C(show_interfaces.yaml)
+    required: true
+  facts:
+    description:
+      - The C(arista_eos) facts already collected for the device
+    required: false
+    default: null
+    type: dict
+"""
+
+EXAMPLES = """
+- name: run show interfaces and parse the output
+  eos_cli_parser:
+    command: show interfaces
+    parser: show_interfaces.yaml
+"""
+
+RETURN = """
+ansible_facts:
+  description: The C(arista_eos) facts extended with the facts parsed from
+    the command output
+  returned: when a native parser is registered for the template
+  type: dict
+  sample: {"arista_eos": {"interfaces": {"Ethernet1": {"oper_status": "up"}}}}
+"""
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.eos import get_connection, run_commands
+from ansible.module_utils.cli_parsers import get_parser, merge
+
+
+def main():
+    """ main entry point for module execution
+    """
+    argument_spec = dict(
+        command=dict(required=True),
+        parser=dict(required=True),
+        facts=dict(type='dict')
+    )
+
+    module = AnsibleModule(argument_spec=argument_spec,
+                           supports_check_mode=True)
+
+    result = {'changed': False}
+
+    parser = get_parser(module.params['parser'])
+    if parser:
+        connection = get_connection(module)
+        output = run_commands(connection, [module.params['command']])[0]
+        facts = merge(module.params['facts'] or {}, parser(output))
+        result['ansible_facts'] = {'arista_eos': facts}
+
+    module.exit_json(**result)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,242 @@
+#!/usr/bin/python
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'network'}
+
+
+DOCUMENTATION = """
+---
+module: eos_config_facts
+version_added: "2.7"
+author: "Peter Sprygada (@privateip)"
+short_description: Parse the Arista EOS configuration into structured data
+description:
+  - This module parses the text configuration of an Arista EOS device into
+    a tree of configuration sections, once, and returns the system, bgp and
+    interfaces values found in it.
+options:
+  content:
+    description:
+      - The text configuration to parse.  When not set, the device running
+        configuration is retrieved over the connection.
+    required: false
+    default: null
+  sections:
+    description:
+      - Retrieves and parses only the listed top level sections of the
+        running configuration, for instance C(router bgp), using
+        C(show running-config section) rather than the full configuration.
+        Mutually exclusive with C(content).
+    required: false
+    default: null
+    type: list
+  cache:
+    description:
+      - Path to a local file used to cache the parsed configuration of the
+        device between runs.  A configuration identical to the previous run
+        is read back without being parsed and otherwise only the blocks of
+        sections whose text changed are parsed again.  Writing the cache
+        makes the first run slower than parsing so only set this when the
+        module runs repeatedly against a mostly unchanged configuration.
+        Use one file per device.
+    required: false
+    default: null
+    type: path
+  facts:
+    description:
+      - The C(arista_eos) facts already collected for the device.  They
+        are returned as C(arista_eos) with the keys collected by this module
+        replaced so the facts published by earlier tasks are kept.
+    required: false
+    default: null
+    type: dict
+"""
+
+EXAMPLES = """
+- name: parse the device running configuration
+  eos_config_facts:
+  register: result
+
+- name: parse a configuration retrieved earlier
+  eos_config_facts:
+    content: "{{ configuration }}"
+
+- name: parse the bgp configuration reusing unchanged sections
+  eos_config_facts:
+    sections:
+      - router bgp
+    cache: "/var/cache/eos/{{ inventory_hostname }}.json"
+"""
+
+RETURN = """
+ansible_facts:
+  description: The C(arista_eos) facts with the values parsed from the
+    configuration under C(config)
+  returned: always
+  type: dict
+  sample: {"arista_eos": {"config": {"system": {"hostname": "leaf1"}, "bgp": {"bgp_as": "65000"}, "interfaces": {}}}}
+changed_sections:
+  description: The sections whose text changed since the previous run
+  returned: when cache is set
+  type: list
+  sample: ["router bgp 65000"]
+removed_sections:
+  description: The top level sections removed since the previous run
+  returned: when cache is set
+  type: list
+  sample: ["interface Ethernet4"]
+"""
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.eos import get_connection
+from ansible.module_utils.config import RunningConfig
+from ansible.module_utils.section_cache import SectionCache, get_sections
+
+
+def first_value(section, prefix):
+    """ Returns the remainder of the first line starting with prefix
+    """
+    for line in section.find(prefix):
+        return line[len(prefix):]
+
+
+def parse_system(config):
+    facts = dict(hostname=first_value(config, 'hostname '),
+                 domain_name=first_value(config, 'ip domain-name '))
+
+    lookup = dict(enabled=False, vrf=None, source_interface=None)
+    value = first_value(config, 'ip domain lookup ')
+    if value:
+        words = value.split()
+        lookup['enabled'] = True
+        if 'vrf' in words[:-1]:
+            lookup['vrf'] = words[words.index('vrf') + 1]
+        if 'source-interface' in words[:-1]:
+            lookup['source_interface'] = words[words.index('source-interface') + 1]
+    facts['domain_lookup'] = lookup
+
+    servers = list()
+    for line in config.find('ip name-server '):
+        words = line.split()[2:]
+        vrf = 'default'
+        if words[0] == 'vrf':
+            vrf, words = words[1], words[2:]
+        servers.extend(dict(server=server, vrf=vrf) for server in words)
+    facts['name_servers'] = servers
+
+    return facts
+
+
+def parse_bgp(config):
+    for line in config.find('router bgp '):
+        section = config.section(line)
+        break
+    else:
+        return {}
+
+    maximum_paths = first_value(section, 'maximum-paths ')
+    connected = first_value(section, 'redistribute connected')
+
+    route_map = None
+    if connected and 'route-map' in connected.split()[:-1]:
+        words = connected.split()
+        route_map = words[words.index('route-map') + 1]
+
+    return {
+        'bgp_as': line.split()[2],
+        'router_id': first_value(section, 'router-id '),
+        'maximum_paths': maximum_paths.split()[0] if maximum_paths else None,
+        'redistribute': {
+            'connected': {
+                'enabled': connected is not None,
+                'route_map': route_map
+            }
+        }
+    }
+
+
+def parse_interfaces(config):
+    facts = dict()
+    for line in config.find('interface '):
+        section = config.section(line)
+
+        address = first_value(section, 'ip address ')
+        ipv4 = dict(address=None, netmask=None, dhcp=address == 'dhcp')
+        if address and '/' in address:
+            ipv4['address'], ipv4['netmask'] = address.split()[0].split('/')
+
+        facts[line.split()[1]] = {
+            'description': first_value(section, 'description '),
+            'enabled': 'shutdown' not in section,
+            'ipv4': ipv4
+        }
+    return facts
+
+
+def main():
+    """ main entry point for module execution
+    """
+    argument_spec = dict(
+        content=dict(),
+        sections=dict(type='list'),
+        cache=dict(type='path'),
+        facts=dict(type='dict')
+    )
+
+    module = AnsibleModule(argument_spec=argument_spec,
+                           mutually_exclusive=[['content', 'sections']],
+                           supports_check_mode=True)
+
+    cache = None
+    if module.params['cache']:
+        cache = SectionCache(module.params['cache'])
+
+    if module.params['sections']:
+        if cache:
+            config = cache.fetch(get_connection(module), module.params['sections'])
+        else:
+            texts = get_sections(get_connection(module), module.params['sections'])
+            config = RunningConfig.from_text('\n'.join(texts))
+    else:
+        content = module.params['content']
+        if content is None:
+            content = get_connection(module).get('show running-config')
+        config = cache.from_text(content) if cache else RunningConfig.from_text(content)
+
+    facts = dict(module.params['facts'] or {})
+    facts['config'] = {
+        'system': parse_system(config),
+        'bgp': parse_bgp(config),
+        'interfaces': parse_interfaces(config)
+    }
+
+    result = {
+        'changed': False,
+        'ansible_facts': {'arista_eos': facts}
+    }
+
+    if cache:
+        cache.save()
+        result['changed_sections'] = cache.changed
+        result['removed_sections'] = cache.removed
+
+    module.exit_json(**result)
+
+if __name__ == '__main__':
+    main()
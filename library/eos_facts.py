@@ -0,0 +1,137 @@
+#!/usr/bin/python
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'network'}
+
+
+DOCUMENTATION = """
+---
+module: eos_facts
+version_added: "2.7"
+author: "Peter Sprygada (@privateip)"
+short_description: Collect facts from Arista EOS devices in one request
+description:
+  - This module collects the requested subsets of facts from an Arista EOS
+    device.  The show commands for all subsets are sent to the device as a
+    single batch and the output is parsed in the module using the native
+    parsers, so the facts are returned in one result.
+options:
+  subset:
+    description:
+      - The list of fact subsets to collect, one or more of C(system),
+        C(vlans), C(switchports), C(ip_interfaces), C(interfaces) and
+        C(lldp).  Use C(all) to collect every subset.
+    required: false
+    default: all
+    type: list
+  json:
+    description:
+      - Use the C(| json) variant of the commands that have one.  When not
+        set, json output is used if the device runs C(json_min_version) or
+        later.
+    required: false
+    default: null
+    type: bool
+  json_min_version:
+    description:
+      - The EOS release from which the C(| json) variant of the commands is
+        used when C(json) is not set
+    required: false
+    default: "4.14"
+  facts:
+    description:
+      - The C(arista_eos) facts already collected for the device.  They
+        are returned as C(arista_eos) with the keys collected by this module
+        replaced so the facts published by earlier tasks are kept.
+    required: false
+    default: null
+    type: dict
+"""
+
+EXAMPLES = """
+- name: collect all facts
+  eos_facts:
+
+- name: collect interfaces and lldp facts
+  eos_facts:
+    subset:
+      - interfaces
+      - lldp
+"""
+
+RETURN = """
+ansible_facts:
+  description: The collected facts under the arista_eos key
+  returned: always
+  type: dict
+  sample: {"arista_eos": {"capabilities": {}, "system": {}, "interfaces": {}}}
+"""
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.eos import Version, get_connection, get_capabilities, get_features, get_version, run_commands
+from ansible.module_utils.cli_parsers import FACT_COMMANDS, get_parser, merge
+
+
+def main():
+    """ main entry point for module execution
+    """
+    argument_spec = dict(
+        subset=dict(type='list', default=['all']),
+        json=dict(type='bool'),
+        json_min_version=dict(default='4.14'),
+        facts=dict(type='dict')
+    )
+
+    module = AnsibleModule(argument_spec=argument_spec,
+                           supports_check_mode=True)
+
+    subset = module.params['subset']
+    if 'all' in subset or '*' in subset:
+        subset = sorted(FACT_COMMANDS)
+
+    invalid = [name for name in subset if name not in FACT_COMMANDS]
+    if invalid:
+        module.fail_json(msg='invalid subset %s, expected one of %s'
+                         % (', '.join(invalid), ', '.join(sorted(FACT_COMMANDS))))
+
+    connection = get_connection(module)
+
+    capabilities = get_capabilities(connection)['device_info']
+
+    use_json = module.params['json']
+    if use_json is None:
+        use_json = get_version(connection) >= Version(module.params['json_min_version'])
+
+    commands = list()
+    for name in subset:
+        text, structured = FACT_COMMANDS[name]
+        commands.append(structured if use_json and structured else text)
+
+    responses = run_commands(connection, [command for command, _ in commands])
+
+    facts = {'capabilities': capabilities, 'features': get_features(connection)}
+    for (_, template), output in zip(commands, responses):
+        merge(facts, get_parser(template)(output))
+
+    result = dict(module.params['facts'] or {})
+    result.update(facts)
+    module.exit_json(changed=False, ansible_facts={'arista_eos': result})
+
+if __name__ == '__main__':
+    main()
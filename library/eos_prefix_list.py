@@ -33,7 +33,19 @@ notes:
   - Tested against EOS 4.15
 options:
   name:
-    required: true
+    description:
+      - The name of the prefix list to manage.  This argument is mutually
+        exclusive with C(aggregate)
+    required: false
+  aggregate:
+    description:
+      - The list of prefix lists to manage.  Each item supports the C(name),
+        C(entries), C(src), C(optimize), C(replace) and C(state) arguments.
+        Values not set on the item are inherited from the module arguments.  All of the prefix
+        lists are compared against a single read of the device configuration
+        and the changes are committed in one configuration session.
+    required: false
+    type: list
   entries:
     description:
       - The set of prefix list entries to configure for the named prefix list
@@ -78,12 +90,75 @@ options:
         required: false
         default: null
         type: int
+  src:
+    description:
+      - Path to a file with the prefix list entries to configure, one entry
+        per line.  Each line is either in the device syntax
+        (C(seq 10 permit 10.0.0.0/8 le 24)) or comma separated values in the
+        order seqno, rule, prefix, ge, le, eq.  The file is read one line at
+        a time as the entries are compared against the device.  This
+        argument is mutually exclusive with C(entries).
+    required: false
+    default: null
+  optimize:
+    description:
+      - Compacts the desired entries before they are compared with the
+        device.  Entries that are shadowed by an earlier entry are dropped
+        and adjacent prefixes within consecutive entries of the same rule
+        are aggregated into a single entry.  The first match result for any
+        prefix is unchanged.  Aggregated entries take the lowest sequence
+        number of the entries they replace so this is normally combined
+        with C(replace).
+    required: false
+    default: false
+    type: bool
   replace:
     description:
       - Replaces the current prefix list entries with the ones configured in
-        the entries argument.
+        the entries argument.  Entries not found in the entries argument are
+        removed from the prefix list.
+    required: false
+    default: null
+  eapi:
+    description:
+      - Connects to the device using the Arista eAPI (JSON-RPC over HTTP)
+        transport instead of the network_cli persistent connection.  Show
+        commands and configuration sessions are sent as batched runCmds
+        requests over pooled keep-alive connections.
     required: false
     default: null
+    type: dict
+    suboptions:
+      host:
+        description:
+          - The hostname or address of the eAPI endpoint
+        required: true
+      port:
+        description:
+          - The port of the eAPI endpoint, defaults to 443 or 80 based on
+            the value of C(use_ssl)
+        type: int
+      username:
+        description:
+          - The username used to authenticate to eAPI
+      password:
+        description:
+          - The password used to authenticate to eAPI
+      use_ssl:
+        description:
+          - Connect to eAPI using HTTPS
+        type: bool
+        default: true
+      validate_certs:
+        description:
+          - Validate the device certificate when C(use_ssl) is enabled
+        type: bool
+        default: true
+      timeout:
+        description:
+          - The timeout in seconds for each eAPI request
+        type: int
+        default: 30
   state:
     description:
       - Adds or removes the prefix list from the current device running
@@ -101,27 +176,70 @@ EXAMPLES = """
     entries:
       - seqno: 10
         prefix: 10.0.0.0/24
+
+- name: configure multiple prefix lists at once
+  eos_prefix_list:
+    aggregate:
+      - name: CUSTOMER_A
+        entries:
+          - seqno: 10
+            prefix: 192.0.2.0/24
+      - name: CUSTOMER_B
+        entries:
+          - seqno: 10
+            prefix: 198.51.100.0/24
+      - name: CUSTOMER_C
+        state: absent
+    replace: yes
+
+- name: load a large prefix list from a file
+  eos_prefix_list:
+    name: IRR_AS65000
+    src: /var/lib/irr/AS65000.txt
+    optimize: yes
+    replace: yes
 """
 
 RETURN = """
+commands:
+  description: The commands sent to the device, only the first 100 when the
+    entries are read from C(src)
+  returned: always
+  type: list
+  sample: ["ip prefix-list PL", "seq 10 permit 10.0.0.0/8 le 24"]
+count:
+  description: The number of commands sent to the device
+  returned: always
+  type: int
+  sample: 2
 """
 from ansible.module_utils.basic import AnsibleModule
-from ansible.module_utils.connection import Connection
-from ansible.module_utils.eos import check_version
+from ansible.module_utils.eos import apply, check_version, get_connection, eapi_spec
+from ansible.module_utils._text import to_text
+from ansible.module_utils.prefix_list import prefix_list_commands
 
 
-def configure(entry):
+# number of commands returned when the entries are read from src
+SRC_COMMANDS = 100
 
-    config = ['seq %s' % entry['seqno'], entry['rule'], entry['prefix']]
 
-    if entry['ge']:
-        config.append('ge %s' % entry['ge'])
-    elif entry['le']:
-        config.append('le %s' % entry['le'])
-    elif entry['eq']:
-        config.append('eq %s' % entry['eq'])
+def map_params_to_obj(module):
+    keys = ('entries', 'optimize', 'replace', 'state')
 
-    return ' '.join(config)
+    if not module.params['aggregate']:
+        obj = dict((key, module.params[key]) for key in keys)
+        obj['name'] = module.params['name']
+        obj['src'] = module.params['src']
+        return [obj]
+
+    objs = list()
+    for item in module.params['aggregate']:
+        obj = dict(item)
+        for key in keys:
+            if obj.get(key) is None:
+                obj[key] = module.params[key]
+        objs.append(obj)
+    return objs
 
 
 def main():
@@ -138,60 +256,52 @@ def main():
         eq=dict()
     )
 
-    argument_spec = dict(
+    aggregate_spec = dict(
         name=dict(required=True),
         entries=dict(type='list', elements='dict', options=entries_spec),
+        src=dict(type='path'),
+        optimize=dict(type='bool'),
+        replace=dict(type='bool'),
+        state=dict(choices=['present', 'absent'])
+    )
+
+    argument_spec = dict(
+        name=dict(),
+        aggregate=dict(type='list', elements='dict', options=aggregate_spec),
+        entries=dict(type='list', elements='dict', options=entries_spec),
+        src=dict(type='path'),
+        optimize=dict(type='bool', default=False),
         replace=dict(type='bool', default=False),
+        eapi=dict(type='dict', options=eapi_spec),
         state=dict(default='present', choices=['present', 'absent'])
     )
 
+    required_one_of = [['name', 'aggregate']]
+    mutually_exclusive = [['name', 'aggregate'], ['entries', 'src']]
+
     module = AnsibleModule(argument_spec=argument_spec,
+                           required_one_of=required_one_of,
+                           mutually_exclusive=mutually_exclusive,
                            supports_check_mode=True)
 
-    connection = Connection(module._socket_path)
+    connection = get_connection(module)
 
     if not check_version(connection, 4, 15):
-        module.fail_json('failed version check')
-
-    result = {'changed': False}
-
-    commands = list()
-
-    if module.params['state'] == 'absent':
-        out = connection.get('show ip prefix-list %s' % module.params['name'])
-        if out:
-            commands.append('no ip prefix-list %s' % module.params['name'])
-
-    elif module.params['state'] == 'present':
-        if module.params['replace']:
-            commands.append('no ip prefix-list %s' % module.params['name'])
-
-        commands.append('ip prefix-list %s' % module.params['name'])
-
-        out = connection.get('show ip prefix-list %s' % module.params['name'])
-        config_lines = out.split('\n')
-
-        for item in module.params['entries']:
-            entry = configure(item)
-
-            if entry in config_lines:
-                break
-
-            seqno = 'seqno %s' % item['seqno']
-            if seqno in out:
-                commands.append('no seq %s' % module.params['seqno'])
+        module.fail_json(msg='failed version check')
 
-            commands.append(entry)
+    try:
+        commands = prefix_list_commands(connection, map_params_to_obj(module))
+    except (IOError, ValueError) as exc:
+        module.fail_json(msg=to_text(exc))
 
-        commands.append('exit')
+    result = apply(connection, commands, module.check_mode)
+    if not module._diff:
+        result.pop('diff', None)
 
-    if commands:
-        commit = not module.check_mode
-        resp = connection.load_config(commands, commit)
-        if resp.get('diff'):
-            result['changed'] = True
-            if module._diff:
-                result['diff'] = {'prepared': resp['diff']}
+    # a src file can hold many thousands of entries, do not echo them all
+    result['count'] = len(commands)
+    if module.params['src'] or any(item.get('src') for item in module.params['aggregate'] or []):
+        result['commands'] = commands[:SRC_COMMANDS]
 
     module.exit_json(**result)
 
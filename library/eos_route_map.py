@@ -49,8 +49,10 @@ options:
           - deny
       seqno:
         description:
-          - Sets the rule sequence number within the route-map
-        required: true
+          - Sets the rule sequence number within the route-map.  Each entry
+            must use a distinct sequence number.
+        required: false
+        default: 10
         type: int
       description:
         description:
@@ -97,10 +99,53 @@ options:
   replace:
     description:
       - Specifies whether or not the entires configured for this module should
-        replace the current route-map entries on the device.
+        replace the current route-map entries on the device.  Entries and
+        entry statements not configured by this module are removed one
+        sequence at a time so the route-map is never removed from the
+        device.
     type: bool
     required: false
     default: null
+  eapi:
+    description:
+      - Connects to the device using the Arista eAPI (JSON-RPC over HTTP)
+        transport instead of the network_cli persistent connection.  Show
+        commands and configuration sessions are sent as batched runCmds
+        requests over pooled keep-alive connections.
+    required: false
+    default: null
+    type: dict
+    suboptions:
+      host:
+        description:
+          - The hostname or address of the eAPI endpoint
+        required: true
+      port:
+        description:
+          - The port of the eAPI endpoint, defaults to 443 or 80 based on
+            the value of C(use_ssl)
+        type: int
+      username:
+        description:
+          - The username used to authenticate to eAPI
+      password:
+        description:
+          - The password used to authenticate to eAPI
+      use_ssl:
+        description:
+          - Connect to eAPI using HTTPS
+        type: bool
+        default: true
+      validate_certs:
+        description:
+          - Validate the device certificate when C(use_ssl) is enabled
+        type: bool
+        default: true
+      timeout:
+        description:
+          - The timeout in seconds for each eAPI request
+        type: int
+        default: 30
   state:
     description:
       - Specifies whether or not the named route-map should be present in the
@@ -125,46 +170,9 @@ EXAMPLES = """
 RETURN = """
 """
 from ansible.module_utils.basic import AnsibleModule
-from ansible.module_utils.connection import Connection
 from ansible.module_utils._text import to_text
-from ansible.module_utils.eos import check_version
-
-
-def configure(name, entry):
-
-    commands = list()
-
-    if entry['continue'] is not None and entry['continue_seqno'] is not None:
-        raise ValueError('`continue` and `continue_seqno` are mutually exclusive')
-
-    cmd = 'route-map %s' % name
-    if entry['rule']:
-        cmd += ' %s' % entry['rule']
-    if entry['seqno']:
-        cmd += ' %s' % entry['seqno']
-    commands.append(cmd)
-
-    if entry['description']:
-        commands.append('description %s' % entry['description'])
-
-    if entry['include_route_map']:
-        commands.append('sub-route-map %s' % entry['include_route_map'])
-
-    if entry['continue'] is not None:
-        commands.append('continue')
-    elif entry['continue_seqno'] is not None:
-        commands.append('continue %s' % entry['continue_seqno'])
-
-    if entry['match_ip_address_prefix_list']:
-        commands.append('match ip address prefix-list %s' % entry['match_ip_address_prefix_list'])
-
-    if entry['match_ip_address_access_list']:
-        commands.append('match ip address access-list %s' % entry['match_ip_address_access_list'])
-
-    if entry['set_tag']:
-        commands.append('set tag %s' % entry['set_tag'])
-
-    return commands
+from ansible.module_utils.eos import apply, check_version, get_connection, eapi_spec
+from ansible.module_utils.route_map import route_map_commands
 
 
 def main():
@@ -172,7 +180,7 @@ def main():
     """
     entries_spec = {
         'rule': dict(default='permit', choices=['permit', 'deny']),
-        'seqno': dict(type='int'),
+        'seqno': dict(type='int', default=10),
 
         'description': dict(),
         'include_route_map': dict(aliases=['sub_route_map']),
@@ -190,45 +198,26 @@ def main():
         name=dict(required=True),
         entries=dict(type='list', elements='dict', options=entries_spec),
         replace=dict(type='bool', default=False),
+        eapi=dict(type='dict', options=eapi_spec),
         state=dict(default='present', choices=['present', 'absent'])
     )
 
     module = AnsibleModule(argument_spec=argument_spec,
                            supports_check_mode=True)
 
-    connection = Connection(module._socket_path)
+    connection = get_connection(module)
 
     if not check_version(connection, 4, 15):
         module.fail_json(msg='failed version check')
 
-    result = {'changed': False}
-
-    commands = list()
-
-    if module.params['state'] == 'absent':
-        out = connection.get('show route-map %s' % module.params['name'])
-        if out:
-            commands.append('no route-map %s' % module.params['name'])
-
-    elif module.params['state'] == 'present':
-        if module.params['replace']:
-            commands.append('no route-map %s' % module.params['name'])
-
-        try:
-            for entry in module.params['entries']:
-                commands.extend(configure(module.params['name'], entry))
-        except ValueError as exc:
-            module.fail_json(msg=to_text(exc))
-
-        commands.append('exit')
+    try:
+        commands = route_map_commands(connection, module.params)
+    except ValueError as exc:
+        module.fail_json(msg=to_text(exc))
 
-    if commands:
-        commit = not module.check_mode
-        resp = connection.load_config(commands, commit)
-        if resp.get('diff'):
-            result['changed'] = True
-            if module._diff:
-                result['diff'] = {'prepared': resp['diff']}
+    result = apply(connection, commands, module.check_mode)
+    if not module._diff:
+        result.pop('diff', None)
 
     module.exit_json(**result)
 
@@ -0,0 +1,188 @@
+import os
+import gzip
+import json
+import time
+import bisect
+import difflib
+import hashlib
+import tempfile
+
+from ansible.module_utils._text import to_bytes, to_text
+
+
+CONFIG_COMMANDS = {
+    'running': 'show running-config',
+    'startup': 'show startup-config',
+}
+
+# configs are compressed and written in blocks of this size
+WRITE_BLOCK_SIZE = 64 * 1024
+
+# a config is stored in full, and becomes the new base, when its delta
+# against the current base is larger than this fraction of the config
+DELTA_MAX_RATIO = 0.5
+
+
+def _makedirs(path):
+    if not os.path.isdir(path):
+        try:
+            os.makedirs(path)
+        except OSError:
+            # created concurrently by another worker
+            if not os.path.isdir(path):
+                raise
+
+
+class BackupStore(object):
+    """ Content addressed store of device configurations
+
+    Every distinct configuration is written once, gzip compressed, under
+    ``objects/<digest[:2]>/<digest>.gz`` where digest is the SHA256 of the
+    configuration text.  ``hosts/<name>/index`` records one
+    ``<timestamp> <digest>`` line per backup that differs from the previous
+    backup of the host, so unchanged configurations cost neither space nor
+    an index entry.
+
+    With deltas enabled a configuration is stored as the compressed
+    difference against a base configuration of the same host, in
+    ``<digest>.delta.gz``.  Deltas are always taken against a full base so
+    any configuration is rebuilt by applying a single delta.
+    """
+
+    def __init__(self, path, deltas=False):
+        self.path = path
+        self.deltas = deltas
+
+    def object_path(self, digest, delta=False):
+        suffix = '.delta.gz' if delta else '.gz'
+        return os.path.join(self.path, 'objects', digest[:2], digest + suffix)
+
+    def exists(self, digest):
+        return os.path.exists(self.object_path(digest)) or \
+            os.path.exists(self.object_path(digest, delta=True))
+
+    def index_path(self, name):
+        return os.path.join(self.path, 'hosts', name, 'index')
+
+    def history(self, name):
+        """ Returns the list of (timestamp, digest) backups of the host
+        """
+        try:
+            with open(self.index_path(name)) as f:
+                return [tuple(line.split()) for line in f if line.strip()]
+        except IOError:
+            return []
+
+    def latest(self, name):
+        history = self.history(name)
+        if history:
+            return history[-1][1]
+
+    def find(self, name, timestamp):
+        """ Returns the digest of the backup of the host in effect at the
+        timestamp, an ISO 8601 UTC string, or None if there was none yet
+        """
+        history = self.history(name)
+        index = bisect.bisect_right([ts for ts, _ in history], timestamp)
+        if index:
+            return history[index - 1][1]
+
+    def _read_delta(self, digest):
+        with gzip.open(self.object_path(digest, delta=True), 'rb') as f:
+            return json.loads(to_text(f.read()))
+
+    def base(self, digest):
+        """ Returns the digest of the full configuration digest is stored
+        against, digest itself when it is stored in full
+        """
+        if os.path.exists(self.object_path(digest)):
+            return digest
+        return self._read_delta(digest)['base']
+
+    def read(self, digest):
+        """ Returns the configuration text, rebuilt from its delta if needed
+        """
+        if os.path.exists(self.object_path(digest)):
+            with gzip.open(self.object_path(digest), 'rb') as f:
+                return to_text(f.read())
+
+        delta = self._read_delta(digest)
+        lines = self.read(delta['base']).splitlines(True)
+        config = list()
+        offset = 0
+        for start, end, replacement in delta['ops']:
+            config.extend(lines[offset:start])
+            config.extend(replacement)
+            offset = end
+        config.extend(lines[offset:])
+        return ''.join(config)
+
+    def diff(self, before, after, context=3):
+        """ Returns the unified diff between two stored configurations
+        """
+        return ''.join(difflib.unified_diff(self.read(before).splitlines(True),
+                                            self.read(after).splitlines(True),
+                                            before, after, n=context))
+
+    def _make_delta(self, base, data):
+        old = self.read(base).splitlines(True)
+        new = to_text(data).splitlines(True)
+        ops = [[i1, i2, new[j1:j2]] for tag, i1, i2, j1, j2
+               in difflib.SequenceMatcher(None, old, new).get_opcodes() if tag != 'equal']
+        return to_bytes(json.dumps({'base': base, 'ops': ops}))
+
+    def _write_object(self, digest, data, delta=False):
+        path = self.object_path(digest, delta)
+        if self.exists(digest):
+            return False
+
+        dirname = os.path.dirname(path)
+        _makedirs(dirname)
+
+        fd, tmp = tempfile.mkstemp(dir=dirname)
+        with os.fdopen(fd, 'wb') as raw:
+            with gzip.GzipFile(fileobj=raw, mode='wb') as f:
+                for offset in range(0, len(data), WRITE_BLOCK_SIZE):
+                    f.write(data[offset:offset + WRITE_BLOCK_SIZE])
+        os.rename(tmp, path)
+        return True
+
+    def save(self, name, config, check_mode=False):
+        """ Stores the configuration of the host
+
+        Returns a dict with the digest of the configuration, changed when
+        it differs from the previous backup of the host, stored when a new
+        object was written and base when it was written as a delta.
+        """
+        data = to_bytes(config)
+        digest = hashlib.sha256(data).hexdigest()
+
+        previous = self.latest(name)
+        result = {'digest': digest, 'changed': digest != previous, 'stored': False}
+
+        if check_mode or not result['changed']:
+            return result
+
+        if self.deltas and previous and not self.exists(digest):
+            base = self.base(previous)
+            delta = self._make_delta(base, data)
+            if len(delta) <= len(data) * DELTA_MAX_RATIO:
+                result['stored'] = self._write_object(digest, delta, delta=True)
+                result['base'] = base
+
+        if not result['stored']:
+            result['stored'] = self._write_object(digest, data)
+
+        index = self.index_path(name)
+        _makedirs(os.path.dirname(index))
+        with open(index, 'a') as f:
+            f.write('%s %s\n' % (time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()), digest))
+
+        return result
+
+
+def backup(connection, store, name, source='running', check_mode=False):
+    """ Retrieves the device configuration and saves it to the store
+    """
+    config = connection.get(CONFIG_COMMANDS[source])
+    return store.save(name, config, check_mode)
@@ -1,28 +1,277 @@
-import re
-import json
+import socket
 
 from ansible.module_utils.six import iteritems
+from ansible.module_utils.config import get_running_config
+from ansible.module_utils.eos import EapiConnection, apply
 
-_CACHED_COMMANDS = {}
 
-def get(connection, command):
-    try:
-        out = _CACHED_COMMANDS[command]
-    except KeyError:
-        out = connection.get(command)
-        if command.endswith('| json'):
-            out = json.loads(out)
-        _CACHED_COMMANDS[command] = out
-    return out
+def get_bgp_config(connection):
+    config = get_running_config(connection)
+    for line in config.find('router bgp '):
+        return line, config.section(line)
+    return None, None
 
 
 def get_bgp_as(connection):
-    out = get(connection, 'show ip bgp summary | json')
-    if 'default'in out['vrfs']:
-        return int(out['vrfs']['default']['asn'])
+    line, section = get_bgp_config(connection)
+    if line:
+        return int(line.split()[2])
+
+
+def _index_peer_groups(config):
+    index = dict()
+    for line in config.find('router bgp '):
+        for item in config.section(line).find('neighbor '):
+            words = item.split()
+            if len(words) == 3 and words[2] == 'peer-group':
+                index.setdefault(words[1], [])
+            elif len(words) == 4 and words[2] == 'peer-group':
+                index.setdefault(words[3], []).append(words[1])
+    return index
+
+
+def get_bgp_peer_groups(connection):
+    """ Returns the neighbors of every BGP peer group keyed by group name
+
+    The map is built from the running-config snapshot in a single pass and
+    shared by every peer group lookup made from it.
+    """
+    config = get_running_config(connection)
+    return config.index('peer_groups', _index_peer_groups)
 
 
 def get_bgp_peer_group_neighbors(connection, peer_group):
-    out = get(connection, 'show ip bgp peer-group %s' % peer_group)
-    matches = re.findall('^\s{6}(\S+),', out, re.M)
-    return matches
+    return list(get_bgp_peer_groups(connection).get(peer_group, []))
+
+
+def bgp_commands(connection, params):
+    """ Returns the commands to converge the global BGP process
+    """
+    bgp_as = get_bgp_as(connection)
+
+    commands = list()
+
+    if params['state'] == 'absent':
+        commands.append('no router bgp %s' % params['bgp_as'])
+
+    elif params['state'] == 'present':
+        if bgp_as and bgp_as != params['bgp_as']:
+            commands.append('no router bgp %s' % bgp_as)
+
+        config = list()
+
+        if params['router_id']:
+            config.append('router-id %s' % params['router_id'])
+
+        if params['maximum_paths']:
+            config.append('maximum-paths %s' % params['maximum_paths'])
+
+        if config:
+            commands.append('router bgp %s' % params['bgp_as'])
+            commands.extend(config)
+
+    return commands
+
+
+def _peer_group_settings(params):
+    commands = list()
+
+    name = params['name']
+    negate_on_none = params['negate_on_none']
+
+    def add(cmd):
+        return 'neighbor %s %s' % (name, cmd)
+
+    def negate(cmd):
+        return 'no %s' % add(cmd)
+
+    if params['remote_as']:
+        commands.append(add('remote-as %s' % params['remote_as']))
+    elif negate_on_none:
+        commands.append(negate('remote-as'))
+
+    if params['maximum_routes']:
+        commands.append(add('maximum-routes %s' % params['maximum_routes']))
+    elif negate_on_none:
+        commands.append(negate('maximum-routes'))
+
+    if params['next_hop_unchanged'] is True:
+        commands.append(add('next-hop-unchanged'))
+    elif params['next_hop_unchanged'] is False or negate_on_none:
+        commands.append(negate('next-hop-unchanged'))
+
+    if params['update_source']:
+        commands.append(add('update-source %s' % params['update_source']))
+    elif negate_on_none:
+        commands.append(negate('update-source'))
+
+    if params['ebgp_multihop'] is not None:
+        commands.append(add('ebgp-multihop %s' % params['ebgp_multihop']))
+    elif negate_on_none:
+        commands.append(negate('ebgp-multihop'))
+
+    if params['send_community_extended']:
+        commands.append(add('send-community extended'))
+    elif negate_on_none:
+        commands.append(negate('send-community extended'))
+
+    return commands
+
+
+def _neighbor_key(neighbor):
+    for family, af in ((4, socket.AF_INET), (6, socket.AF_INET6)):
+        try:
+            return (family, socket.inet_pton(af, neighbor))
+        except (socket.error, ValueError):
+            pass
+    return (0, neighbor)
+
+
+def diff_neighbors(members, desired, managed):
+    """ Returns the commands to converge peer group neighbor membership
+
+    :param members: dict of the current peer group keyed by neighbor
+    :param desired: dict of the desired peer group keyed by neighbor
+    :param managed: the set of peer groups whose membership is managed
+
+    Neighbors that leave a managed group without joining another one are
+    removed first, then neighbors joining or moving between groups are
+    assigned.  A move is a single command since assigning a neighbor to a
+    peer group replaces its previous group.  Both lists are sorted by
+    neighbor address so the output is stable across runs.
+    """
+    removes = [neighbor for neighbor, name in iteritems(members)
+               if name in managed and neighbor not in desired]
+    adds = [neighbor for neighbor, name in iteritems(desired)
+            if members.get(neighbor) != name]
+
+    commands = ['no neighbor %s peer-group' % neighbor
+                for neighbor in sorted(removes, key=_neighbor_key)]
+    commands.extend('neighbor %s peer-group %s' % (neighbor, desired[neighbor])
+                    for neighbor in sorted(adds, key=_neighbor_key))
+    return commands
+
+
+def peer_groups_commands(connection, groups):
+    """ Returns the commands to converge a list of BGP peer groups
+
+    Neighbor membership is compared across all of the groups at once so a
+    neighbor moving from one managed group to another is only moved and
+    never removed.
+    """
+    bgp_as = get_bgp_as(connection)
+
+    if not bgp_as:
+        raise ValueError('bgp not configured on this node')
+
+    current = get_bgp_peer_groups(connection)
+
+    commands = list()
+    managed = set()
+    desired = dict()
+    replaced = set()
+
+    for params in groups:
+        name = params['name']
+
+        if params['state'] == 'absent':
+            if name in current:
+                commands.append('no neighbor %s' % name)
+            continue
+
+        if params['replace'] and name in current:
+            commands.append('no neighbor %s' % name)
+            replaced.add(name)
+
+        if name not in current or name in replaced:
+            commands.append('neighbor %s peer-group' % name)
+
+        commands.extend(_peer_group_settings(params))
+
+        if params['neighbors'] is not None:
+            managed.add(name)
+            for neighbor in params['neighbors']:
+                desired[neighbor] = name
+
+    members = dict()
+    for name, neighbors in iteritems(current):
+        if name in replaced:
+            continue
+        for neighbor in neighbors:
+            members[neighbor] = name
+
+    commands.extend(diff_neighbors(members, desired, managed))
+
+    if commands:
+        commands.insert(0, 'router bgp %s' % bgp_as)
+        commands.append('exit')
+
+    return commands
+
+
+def peer_group_commands(connection, params):
+    """ Returns the commands to converge a BGP peer group
+    """
+    return peer_groups_commands(connection, [params])
+
+
+def redistribution_commands(connection, params):
+    """ Returns the commands to converge BGP route redistribution
+    """
+    bgp_as = get_bgp_as(connection)
+
+    if not bgp_as:
+        raise ValueError('bgp not configured on this node')
+
+    commands = ['router bgp %s' % bgp_as, 'no redistribute %s' % params['protocol']]
+
+    if params['state'] == 'present':
+        cmd = 'redistribute %s' % params['protocol']
+        if params['route_map'] is not None:
+            cmd += ' route-map %s' % params['route_map']
+        commands.append(cmd)
+
+    commands.append('exit')
+
+    return commands
+
+
+def address_family_commands(connection, params):
+    """ Returns the commands to converge a BGP address family
+    """
+    bgp_as = get_bgp_as(connection)
+
+    if not bgp_as:
+        raise ValueError('bgp not configured on this node')
+
+    commands = ['router bgp %s' % bgp_as]
+
+    if params['state'] == 'absent':
+        commands.extend(['no address-family %s' % params['afi'], 'exit'])
+        return commands
+
+    if params['replace']:
+        commands.append('no address-family %s' % params['afi'])
+
+    commands.append('address-family %s' % params['afi'])
+
+    for entry in params['neighbors'] or []:
+        if entry['activate'] is True:
+            commands.append('neighbor %s activate' % entry['name'])
+        elif entry['activate'] is False:
+            commands.append('no neighbor %s activate' % entry['name'])
+
+    commands.append('exit')
+
+    return commands
+
+
+def reconcile(device, build, params, check_mode=False, batch_size=None):
+    """ Converges a device over eAPI
+
+    Connects to the device, a dict of eapi options, calls
+    build(connection, params), for example bgp_commands, and loads the
+    resulting commands onto the device.
+    """
+    connection = EapiConnection(**device)
+    return apply(connection, build(connection, params), check_mode, batch_size)
@@ -0,0 +1,292 @@
+import re
+
+
+# kept in sync with the expand_interface_name filter in filter_plugins/eos.py
+INTERFACE_NAMES = {
+    'Et': 'Ethernet',
+    'Eth': 'Ethernet',
+    'Ma': 'Management',
+    'Mgmt': 'Management',
+    'Vl': 'Vlan',
+    'Po': 'Port-Channel',
+    'Lo': 'Loopback',
+    'Tu': 'Tunnel',
+    'Vx': 'Vxlan',
+    'Rc': 'Recirc-Channel',
+}
+
+_PREFIXES = dict((name.lower(), full) for name, full in INTERFACE_NAMES.items())
+_PREFIXES.update((full.lower(), full) for full in INTERFACE_NAMES.values())
+
+INTERFACE_RE = re.compile(r'^([a-zA-Z][a-zA-Z-]*?)\s*(\d+(?:/\d+)*(?:\.\d+)?)$')
+
+IF_START_RE = re.compile(r'^.+ is up,')
+IF_NAME_RE = re.compile(r'^(\S+) is (\w+)')
+IF_PROTOCOL_RE = re.compile(r'line protocol is (\S+)')
+IF_MAC_RE = re.compile(r'address is ([\d|\w]{4}.[\d|\w]{4}.[\d|\w]{4})')
+IF_MTU_RE = re.compile(r'MTU (\d+)')
+IF_IPV4_RE = re.compile(r'Internet address is (.+)')
+
+IP_START_RE = re.compile(r'.+ is up,')
+IP_NAME_RE = re.compile(r'^(\S+) is up, line protocol is (\w+)')
+IP_IPV4_RE = re.compile(r'Internet address is (.+)/(\d+)')
+IP_MTU_RE = re.compile(r'IP MTU (\d+)')
+IP_VRF_RE = re.compile(r'VPN Routing/Forwarding "(\w+)"')
+IP_PROXY_ARP_RE = re.compile(r'(?<!Local )Proxy-ARP is enabled')
+
+SW_START_RE = re.compile(r'^Name: ')
+SW_NAME_RE = re.compile(r'Name: (.+)')
+SW_ADMIN_RE = re.compile(r'Administrative Mode: (.+)')
+SW_OPER_RE = re.compile(r'Operational Mode: (.+)')
+SW_ACCESS_RE = re.compile(r'Access Mode VLAN: (\d+)')
+SW_NATIVE_RE = re.compile(r'Trunking Native Mode VLAN: (\d+)')
+
+LLDP_RE = re.compile(r'^([E|M]\w+\d+)\s+(\S+)\s+(\S+)')
+
+VLAN_RE = re.compile(r'(\d+)\s+(\w+)\s+(\w+)\s+([Et\d+|,|\s]*)$')
+
+VERSION_RE = re.compile(r'image version:\s+(.+)')
+VERSION_MAC_RE = re.compile(r'MAC address:\s+(.+)')
+VERSION_TOTAL_RE = re.compile(r'Total memory:\s+(\d+)')
+VERSION_FREE_RE = re.compile(r'Free memory:\s+(\d+)')
+VERSION_UPTIME_RE = re.compile(r'Uptime:\s+(.+)')
+
+
+def expand_interface_name(name):
+    match = INTERFACE_RE.match(name)
+    if match:
+        prefix = _PREFIXES.get(match.group(1).lower())
+        if prefix:
+            return prefix + match.group(2)
+    return name
+
+
+def split_blocks(output, start_re):
+    """ Splits command output into blocks, each starting at a line that
+    matches start_re, in a single pass over the lines
+    """
+    block = None
+    for line in output.splitlines():
+        if start_re.match(line):
+            if block:
+                yield '\n'.join(block)
+            block = [line]
+        elif block is not None:
+            block.append(line)
+    if block:
+        yield '\n'.join(block)
+
+
+def search(regex, text, group=1):
+    match = regex.search(text)
+    if match:
+        return match.group(group)
+
+
+def _version(string):
+    parts = string.split('.')
+    return dict(string=string, major=parts[0],
+                minor=parts[1] if len(parts) > 1 else None,
+                maint=parts[2] if len(parts) > 2 else None)
+
+
+def parse_show_version(output):
+    version = search(VERSION_RE, output)
+    return {'system': {
+        'system_mac': search(VERSION_MAC_RE, output),
+        'uptime': search(VERSION_UPTIME_RE, output),
+        'version': _version(version) if version else None,
+        'memory': {
+            'total': search(VERSION_TOTAL_RE, output),
+            'free_mem': search(VERSION_FREE_RE, output)
+        }
+    }}
+
+
+def _mac(address):
+    """ Formats a json mac address as the xxxx.xxxx.xxxx text form
+    """
+    if address:
+        digits = address.replace(':', '').replace('.', '')
+        return '.'.join(digits[i:i + 4] for i in (0, 4, 8))
+
+
+def _uptime(seconds):
+    """ Formats a json uptime in seconds as the show version text form
+    """
+    minutes = int(seconds) // 60
+    return '%d weeks, %d days, %d hours and %d minutes' % (
+        minutes // 10080, minutes // 1440 % 7, minutes // 60 % 24, minutes % 60)
+
+
+def _text(value):
+    if value is not None:
+        return str(value)
+
+
+def parse_show_version_json(output):
+    return {'system': {
+        'system_mac': _mac(output.get('systemMacAddress')),
+        'uptime': _uptime(output['uptime']) if output.get('uptime') is not None else None,
+        'version': _version(output['version']) if output.get('version') else None,
+        'memory': {
+            'total': _text(output.get('memTotal')),
+            'free_mem': _text(output.get('memFree'))
+        }
+    }}
+
+
+def parse_show_interfaces(output):
+    interfaces = dict()
+    for block in split_blocks(output, IF_START_RE):
+        match = IF_NAME_RE.match(block)
+        if not match:
+            continue
+        entry = {
+            'oper_status': match.group(2),
+            'mac_address': search(IF_MAC_RE, block),
+            'line_protocol': search(IF_PROTOCOL_RE, block),
+            'mtu': search(IF_MTU_RE, block)
+        }
+        address = search(IF_IPV4_RE, block)
+        if address:
+            address, _, masklen = address.partition('/')
+            entry['ipv4'] = dict(address=address, masklen=masklen)
+        interfaces[match.group(1)] = entry
+    return {'interfaces': interfaces}
+
+
+def parse_show_interfaces_json(output):
+    interfaces = dict()
+    for name, values in (output.get('interfaces') or {}).items():
+        entry = {
+            'oper_status': 'up' if values.get('interfaceStatus') == 'connected' else 'down',
+            'mac_address': _mac(values.get('physicalAddress')),
+            'line_protocol': values.get('lineProtocolStatus'),
+            'mtu': _text(values.get('mtu'))
+        }
+        for address in values.get('interfaceAddress') or []:
+            primary = address.get('primaryIp') or {}
+            if primary.get('maskLen'):
+                entry['ipv4'] = dict(address=primary.get('address'),
+                                     masklen=_text(primary['maskLen']))
+            break
+        interfaces[name] = entry
+    return {'interfaces': interfaces}
+
+
+def parse_show_ip_interface(output):
+    interfaces = dict()
+    for block in split_blocks(output, IP_START_RE):
+        name = search(IP_NAME_RE, block)
+        if not name:
+            continue
+        address = IP_IPV4_RE.search(block)
+        interfaces[name] = {
+            'enabled': 'No Internet protocol address assigned' not in block,
+            'ipv4': {
+                'address': address.group(1) if address else None,
+                'masklen': address.group(2) if address else None,
+                'dhcp': 'Address determined by DHCP' in block,
+                'proxy_arp': IP_PROXY_ARP_RE.search(block) is not None,
+                'local_proxy_arp': 'Local Proxy-ARP is enabled' in block
+            },
+            'mtu': search(IP_MTU_RE, block),
+            'vrf': search(IP_VRF_RE, block)
+        }
+    return {'interfaces': interfaces}
+
+
+def parse_show_interfaces_switchport(output):
+    interfaces = dict()
+    for block in split_blocks(output, SW_START_RE):
+        interfaces[expand_interface_name(search(SW_NAME_RE, block).strip())] = {'switchport': {
+            'enabled': 'Switchport: Enabled' in block,
+            'admin_mode': search(SW_ADMIN_RE, block),
+            'oper_mode': search(SW_OPER_RE, block),
+            'mac_address_learning': 'MAC Address Learning: enabled' in block,
+            'access_vlan': search(SW_ACCESS_RE, block),
+            'trunk_native_vlan': search(SW_NATIVE_RE, block)
+        }}
+    return {'interfaces': interfaces}
+
+
+def parse_show_lldp_neighbors(output):
+    neighbors = list()
+    for line in output.splitlines():
+        match = LLDP_RE.match(line)
+        if match:
+            neighbors.append({
+                'port': expand_interface_name(match.group(1)),
+                'neighbor': match.group(2).split('.')[0],
+                'neighbor_port': match.group(3)
+            })
+    return {'lldp': {'neighbors': neighbors}}
+
+
+def parse_show_lldp_neighbors_json(output):
+    neighbors = list()
+    for item in output.get('lldpNeighbors') or []:
+        neighbors.append({
+            'port': item.get('port'),
+            'neighbor': (item.get('neighborDevice') or '').split('.')[0],
+            'neighbor_port': item.get('neighborPort')
+        })
+    return {'lldp': {'neighbors': neighbors}}
+
+
+def parse_show_vlan(output):
+    vlans = list()
+    for line in output.splitlines():
+        match = VLAN_RE.search(line)
+        if match:
+            vlans.append(dict(vlan_id=match.group(1), name=match.group(2),
+                              status=match.group(3)))
+    return {'vlans': vlans}
+
+
+# native parsers keyed by the parser_templates/cli template they replace,
+# templates without an entry are run through command_parser
+PARSERS = {
+    'show_version.yaml': parse_show_version,
+    'show_version_json.yaml': parse_show_version_json,
+    'show_interfaces.yaml': parse_show_interfaces,
+    'show_interfaces_json.yaml': parse_show_interfaces_json,
+    'show_ip_interface.yaml': parse_show_ip_interface,
+    'show_interfaces_switchport.yaml': parse_show_interfaces_switchport,
+    'show_lldp_neighbors.yaml': parse_show_lldp_neighbors,
+    'show_lldp_neighbors_json.yaml': parse_show_lldp_neighbors_json,
+    'show_vlan.yaml': parse_show_vlan,
+}
+
+
+def get_parser(template):
+    """ Returns the native parser for the named template or None
+    """
+    return PARSERS.get(template)
+
+
+# fact subsets collected by get_facts, (command, template) pairs for the
+# text and json output of each subset, mirrors vars/commands.yaml
+FACT_COMMANDS = {
+    'system': (('show version', 'show_version.yaml'),
+               ('show version | json', 'show_version_json.yaml')),
+    'vlans': (('show vlan', 'show_vlan.yaml'), None),
+    'switchports': (('show interface switchport', 'show_interfaces_switchport.yaml'), None),
+    'ip_interfaces': (('show ip interface', 'show_ip_interface.yaml'), None),
+    'interfaces': (('show interface', 'show_interfaces.yaml'),
+                   ('show interfaces | json', 'show_interfaces_json.yaml')),
+    'lldp': (('show lldp neighbors', 'show_lldp_neighbors.yaml'),
+             ('show lldp neighbors | json', 'show_lldp_neighbors_json.yaml')),
+}
+
+
+def merge(base, other):
+    """ Recursively merges the dict other into base
+    """
+    for key, value in other.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            merge(base[key], value)
+        else:
+            base[key] = value
+    return base
@@ -0,0 +1,189 @@
+import json
+
+from ansible.module_utils.six import iteritems
+from ansible.module_utils.eos import cached
+
+
+PATH_SEPARATOR = ' > '
+
+
+def parse(text):
+    """ Parses the text running-config into the ``show running-config | json``
+    structure
+
+    Child lines are indented under their parent.  Comment lines starting
+    with ``!`` and the trailing ``end`` are skipped.  The text is read in a
+    single pass.
+    """
+    root = {}
+    # (indent, parent cmds, line) of the enclosing lines
+    stack = []
+
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line or line.startswith('!') or line == 'end':
+            continue
+
+        indent = len(raw) - len(raw.lstrip())
+        while stack and stack[-1][0] >= indent:
+            stack.pop()
+
+        if stack:
+            _, parent, key = stack[-1]
+            node = parent[key]
+            if node is None:
+                node = parent[key] = {'cmds': {}}
+            cmds = node['cmds']
+        else:
+            cmds = root
+
+        cmds.setdefault(line, None)
+        stack.append((indent, cmds, line))
+
+    return root
+
+
+def _index_paths(config):
+    paths = {}
+    stack = [((), config)]
+    while stack:
+        path, section = stack.pop()
+        for line, children in section.items():
+            key = path + (line,)
+            paths[PATH_SEPARATOR.join(key)] = children
+            if len(children):
+                stack.append((key, children))
+    return paths
+
+
+class RunningConfig(object):
+    """ Indexed view of the device running configuration
+
+    The configuration is stored using the same nested structure returned by
+    ``show running-config | json`` where each line of the configuration is a
+    key that maps to either None or a dict with the child lines stored under
+    ``cmds``.  Lookups of a line or a section are dict lookups.
+    """
+
+    def __init__(self, cmds=None):
+        self._cmds = cmds or {}
+        self._indexes = {}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data.get('cmds'))
+
+    @classmethod
+    def from_text(cls, text):
+        return cls(parse(text))
+
+    def __contains__(self, line):
+        return line in self._cmds
+
+    def __iter__(self):
+        return iter(self._cmds)
+
+    def __len__(self):
+        return len(self._cmds)
+
+    def items(self):
+        for line, children in iteritems(self._cmds):
+            yield line, RunningConfig((children or {}).get('cmds'))
+
+    def section(self, *path):
+        """ Returns the section found at path or None if it does not exist
+        """
+        cmds = self._cmds
+        for line in path:
+            try:
+                node = cmds[line]
+            except KeyError:
+                return None
+            cmds = (node or {}).get('cmds') or {}
+        return RunningConfig(cmds)
+
+    def get(self, path):
+        """ Returns the section found at path or None if it does not exist
+
+        The path is the lines leading to the section joined by `` > ``, for
+        instance ``router bgp 65000 > address-family ipv4``.  Every path is
+        indexed on first use so lookups are a single dict lookup.
+        """
+        return self.index('paths', _index_paths).get(path)
+
+    def find(self, prefix):
+        """ Returns the lines at this level that start with prefix
+        """
+        return [line for line in self._cmds if line.startswith(prefix)]
+
+    def index(self, name, builder):
+        """ Returns the named index, building it once using builder(self)
+        """
+        try:
+            return self._indexes[name]
+        except KeyError:
+            index = self._indexes[name] = builder(self)
+            return index
+
+
+def get_running_config(connection):
+    """ Returns the device running-config snapshot
+
+    The parsed configuration is held in the command cache so all lookups
+    made by a module share a single round trip and the indexes built on it.
+    """
+    command = 'show running-config | json'
+    return cached(connection, command,
+                  lambda connection: RunningConfig.from_json(json.loads(connection.get(command))))
+
+
+def _index_prefix_lists(config):
+    index = dict()
+    for line in config:
+        if not line.startswith('ip prefix-list '):
+            continue
+        words = line.split(' ', 3)
+        entries = index.setdefault(words[2], [])
+        if len(words) == 3:
+            entries.extend(config.section(line))
+        else:
+            # older releases render each entry as a single global config line
+            entries.append(words[3])
+    return index
+
+
+def get_prefix_lists(connection):
+    """ Returns the entries of all prefix lists keyed by prefix list name
+    """
+    config = get_running_config(connection)
+    return config.index('prefix_lists', _index_prefix_lists)
+
+
+def get_prefix_list(connection, name):
+    """ Returns the entries configured for the named prefix list
+    """
+    return get_prefix_lists(connection).get(name, [])
+
+
+def _index_route_maps(config):
+    index = dict()
+    for line in config.find('route-map '):
+        words = line.split()
+        if len(words) != 4:
+            continue
+        entries = index.setdefault(words[1], {})
+        entries[int(words[3])] = (words[2], list(config.section(line)))
+    return index
+
+
+def get_route_maps(connection):
+    """ Returns the entries of all route-maps keyed by route-map name
+    """
+    config = get_running_config(connection)
+    return config.index('route_maps', _index_route_maps)
+
+
+def get_route_map(connection, name):
+    """ Returns the (rule, lines) entries of the route-map keyed by seqno
+    """
+    return get_route_maps(connection).get(name, {})
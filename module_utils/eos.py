@@ -1,24 +1,671 @@
+import os
+import re
 import json
+import ssl
+import time
+import base64
+import socket
+import hashlib
+import tempfile
+import threading
 
-def get_capabilities(connection):
-    return json.loads(connection.get_capabilities())
+from collections import OrderedDict
+from functools import total_ordering
 
+from ansible.module_utils._text import to_bytes, to_text
+from ansible.module_utils.six import iteritems
+from ansible.module_utils.connection import Connection, ConnectionError
+from ansible.module_utils.six.moves import http_client
 
 
-def check_version(connection, maj_version=None, min_version=None):
-    capabilities = get_capabilities(connection)
+EAPI_PATH = '/command-api'
+EAPI_MAX_IDLE = 4
+
+# change sets larger than this are pushed in chunks by load_config
+CONFIG_CHUNK_SIZE = 500
+
+# global config modes that enter a context, 'exit' returns to global mode
+CONFIG_CONTEXTS = ('router bgp ', 'route-map ', 'interface ', 'vlan ',
+                   'ip prefix-list ', 'ipv6 prefix-list ',
+                   'ip access-list ', 'ipv6 access-list ')
+
+# sub modes of router bgp
+BGP_CONTEXTS = ('vrf ', 'address-family ')
+
+CACHE_MAXSIZE = 256
+CACHE_TTL = 60
+
+# ttl overrides (in seconds) for commands starting with the given prefix
+COMMAND_TTL = {
+    'show running-config': 30,
+}
+
+# capabilities are cached on disk so every module run against a device in a
+# play reuses them, an upgraded device is picked up once the entry expires
+CAPABILITIES_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.ansible', 'eos', 'capabilities')
+CAPABILITIES_TTL = 3600
+
+# sessions created by ansible are named ansible_<creation time>, in seconds
+# (10 digits) by the network_cli cliconf plugin and in milliseconds (13
+# digits) by EapiConnection and the chunked load_config
+SESSION_NAME_RE = re.compile(r'^ansible_(\d{10}|\d{13})$')
+
+# minimum EOS release for each optional feature used by the role
+FEATURES = {
+    'json_output': '4.14',
+    'running_config_json': '4.15',
+}
+
+eapi_spec = dict(
+    host=dict(required=True),
+    port=dict(type='int'),
+    username=dict(),
+    password=dict(no_log=True),
+    use_ssl=dict(type='bool', default=True),
+    validate_certs=dict(type='bool', default=True),
+    timeout=dict(type='int', default=30)
+)
+
+_EAPI_POOL = dict()
+_EAPI_POOL_LOCK = threading.Lock()
+
+_CAPABILITIES = dict()
+
+
+class EapiConnection(object):
+    """ Connection to the Arista eAPI (JSON-RPC over HTTP) endpoint
+
+    Implements the subset of the network_cli connection methods used by
+    the modules (get, load_config, get_capabilities) plus run_commands
+    which sends a list of commands in a single runCmds request.  HTTP
+    connections are kept alive and pooled per endpoint so requests made
+    by the same process reuse the same TCP and TLS session.
+    """
+
+    def __init__(self, host, port=None, username=None, password=None,
+                 use_ssl=True, validate_certs=True, timeout=30):
+        self.host = host
+        self.port = port or (443 if use_ssl else 80)
+        self.use_ssl = use_ssl
+        self.validate_certs = validate_certs
+        self.timeout = timeout
+
+        self.socket_path = 'eapi://%s:%s' % (self.host, self.port)
+
+        self._key = (self.host, self.port, self.use_ssl)
+        self._headers = {'Content-Type': 'application/json'}
+        if username:
+            auth = base64.b64encode(to_bytes('%s:%s' % (username, password or '')))
+            self._headers['Authorization'] = 'Basic %s' % to_text(auth)
+
+        self._request_id = 0
+
+    def _connect(self):
+        with _EAPI_POOL_LOCK:
+            idle = _EAPI_POOL.get(self._key)
+            if idle:
+                return idle.pop(), True
+
+        if not self.use_ssl:
+            return http_client.HTTPConnection(self.host, self.port, timeout=self.timeout), False
+
+        context = None
+        if not self.validate_certs:
+            context = ssl._create_unverified_context()
+        return http_client.HTTPSConnection(self.host, self.port, timeout=self.timeout,
+                                           context=context), False
+
+    def _release(self, conn):
+        with _EAPI_POOL_LOCK:
+            idle = _EAPI_POOL.setdefault(self._key, [])
+            if len(idle) < EAPI_MAX_IDLE:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def _request(self, body):
+        while True:
+            conn, reused = self._connect()
+            try:
+                conn.request('POST', EAPI_PATH, body, self._headers)
+                resp = conn.getresponse()
+                data = resp.read()
+            except (socket.error, http_client.HTTPException) as exc:
+                conn.close()
+                # idle connections may have been closed by the device
+                if reused:
+                    continue
+                raise ConnectionError('unable to connect to %s: %s' % (self.socket_path, to_text(exc)))
+
+            if resp.status != 200:
+                conn.close()
+                raise ConnectionError('eapi request to %s failed: %s %s'
+                                      % (self.socket_path, resp.status, resp.reason))
+
+            self._release(conn)
+            return json.loads(to_text(data))
+
+    def run_commands(self, commands, output='json'):
+        """ Runs the list of commands in a single request
+
+        Returns one response per command, a dict for json output and the
+        command text for text output.
+        """
+        self._request_id += 1
+        body = json.dumps({
+            'jsonrpc': '2.0',
+            'method': 'runCmds',
+            'id': self._request_id,
+            'params': {'version': 1, 'cmds': ['enable'] + list(commands), 'format': output}
+        })
+
+        resp = self._request(body)
+
+        if 'error' in resp:
+            error = resp['error']
+            messages = [item.get('errors') for item in error.get('data', []) if 'errors' in item]
+            msg = ', '.join(m for errors in messages for m in errors) or error.get('message')
+            raise ConnectionError(msg, code=error.get('code'))
+
+        result = resp['result'][1:]
+        if output == 'text':
+            result = [item.get('output', '') for item in result]
+        return result
+
+    def get(self, command):
+        if command.endswith('| json'):
+            return json.dumps(self.run_commands([command[:-6].strip()])[0])
+        return self.run_commands([command], output='text')[0]
+
+    def load_config(self, commands, commit=True):
+        session = 'ansible_%s' % int(time.time() * 1000)
+        cmds = ['configure session %s' % session]
+        cmds.extend(commands)
+        cmds.append('show session-config diffs')
+        cmds.append('commit' if commit else 'abort')
+
+        try:
+            out = self.run_commands(cmds, output='text')
+        except ConnectionError:
+            try:
+                self.run_commands(['configure session %s' % session, 'abort'])
+            except ConnectionError:
+                pass
+            raise
+
+        return {'diff': out[-2].strip() or None, 'session': session}
+
+    def get_capabilities(self):
+        version, hostname = self.run_commands(['show version', 'show hostname'])
+        return json.dumps({
+            'network_api': 'eapi',
+            'device_info': {
+                'network_os': 'eos',
+                'network_os_version': version['version'],
+                'network_os_model': version['modelName'],
+                'network_os_hostname': hostname['hostname']
+            }
+        })
+
+
+def get_connection(module):
+    """ Returns the connection to the device for the module
+
+    Uses the eAPI transport when the module was called with the eapi
+    argument and the network_cli persistent connection otherwise.
+    """
+    eapi = module.params.get('eapi')
+    if eapi:
+        return EapiConnection(**eapi)
+    return Connection(module._socket_path)
+
+
+def run_commands(connection, commands):
+    """ Runs the list of commands and returns the output of each command
+
+    Commands ending with ``| json`` return the parsed response.  The whole
+    list is sent in one request when the connection supports it, falling
+    back to one request per command otherwise.
+    """
+    commands = list(commands)
+
+    if isinstance(connection, EapiConnection):
+        responses = dict()
+        structured = [cmd for cmd in commands if cmd.endswith('| json')]
+        if structured:
+            out = connection.run_commands([cmd[:-6].strip() for cmd in structured])
+            responses.update(zip(structured, out))
+        text = [cmd for cmd in commands if not cmd.endswith('| json')]
+        if text:
+            responses.update(zip(text, connection.run_commands(text, output='text')))
+        return [responses[cmd] for cmd in commands]
+
+    try:
+        responses = connection.run_commands(commands)
+    except ConnectionError as exc:
+        # method not found, the cliconf plugin does not implement run_commands
+        if getattr(exc, 'code', None) != -32601:
+            raise
+        responses = [connection.get(cmd) for cmd in commands]
+
+    for index, cmd in enumerate(commands):
+        if cmd.endswith('| json') and not isinstance(responses[index], dict):
+            responses[index] = json.loads(responses[index])
+
+    return responses
+
+
+def _enter_context(stack, line):
+    """ Returns the context stack after running line
+    """
+    if line == 'exit':
+        return stack[:-1]
+
+    if line.startswith(CONFIG_CONTEXTS):
+        # ip prefix-list <name> seq ... is a global one line entry
+        if 'prefix-list' in line and len(line.split()) != 3:
+            return stack
+        return [line]
+
+    if stack and stack[0].startswith('router bgp ') and line.startswith(BGP_CONTEXTS):
+        if line.startswith('address-family ') and len(stack) > 1 and stack[1].startswith('vrf '):
+            return stack[:2] + [line]
+        return stack[:1] + [line]
+
+    return stack
+
+
+def split_commands(commands, chunk_size):
+    """ Splits a list of config commands into chunks of about chunk_size
+
+    Every chunk starts in global config mode so a chunk that starts in the
+    middle of a context block (router bgp, route-map, ip prefix-list, ...)
+    is prefixed with the lines needed to enter that context again.
+    """
+    chunks = list()
+    chunk = list()
+    stack = list()
+    fresh = False
+
+    for line in commands:
+        if len(chunk) >= chunk_size:
+            chunks.append(chunk)
+            chunk = list()
+            fresh = True
+
+        if fresh:
+            # the context is entered again below so leading exits are dropped
+            if line == 'exit':
+                stack = stack[:-1]
+                continue
+            if _enter_context(stack, line) != [line]:
+                chunk.extend(stack)
+            fresh = False
+
+        chunk.append(line)
+        stack = _enter_context(stack, line)
+
+    if chunk:
+        chunks.append(chunk)
+
+    return chunks
+
+
+def _run_session(connection, session, commands, end=True):
+    commands = ['configure session %s' % session] + list(commands)
+    if end:
+        commands.append('end')
+
+    if isinstance(connection, EapiConnection):
+        return connection.run_commands(commands, output='text')
+    return run_commands(connection, commands)
+
+
+def load_config(connection, commands, commit=True, chunk_size=CONFIG_CHUNK_SIZE, progress=None):
+    """ Loads config commands onto the device
+
+    Change sets up to chunk_size commands are handed to the connection
+    load_config as is.  Larger change sets are split at context boundaries
+    and pushed in sequence into a single named configuration session which
+    is then committed, or aborted in check mode, as one atomic change.
+    progress, when set, is called with (chunk number, number of chunks)
+    after every chunk is pushed.  Cached output for the connection is
+    invalidated once the commands are committed.
+    """
+    resp = _load_config(connection, commands, commit, chunk_size, progress)
+    if commit:
+        invalidate(connection)
+    return resp
+
+
+def _load_config(connection, commands, commit, chunk_size, progress):
+    if not chunk_size or len(commands) <= chunk_size:
+        resp = connection.load_config(commands, commit)
+        if progress:
+            progress(1, 1)
+        return resp
+
+    session = 'ansible_%s' % int(time.time() * 1000)
+    chunks = split_commands(commands, chunk_size)
+
+    try:
+        for index, chunk in enumerate(chunks):
+            _run_session(connection, session, chunk)
+            if progress:
+                progress(index + 1, len(chunks))
+        diff = _run_session(connection, session, ['show session-config diffs'])[1]
+        _run_session(connection, session, ['commit' if commit else 'abort'], end=False)
+    except ConnectionError:
+        try:
+            _run_session(connection, session, ['abort'], end=False)
+        except ConnectionError:
+            pass
+        raise
 
-    majver = int(capabilities['device_info']['network_os_version'].split('.')[0])
-    minver = int(capabilities['device_info']['network_os_version'].split('.')[1])
+    return {'diff': to_text(diff).strip() or None, 'session': session}
 
-    if maj_version:
-        if not majver >= maj_version:
-            return False
 
-    if min_version:
-        if not minver >= min_version:
-            return False
+class CommandCache(object):
+    """ LRU cache of command output with per entry expiration
 
-    return True
+    Entries are keyed by ``(scope, command)`` where scope identifies the
+    device connection so output is never shared between devices.
+    """
 
+    def __init__(self, maxsize=CACHE_MAXSIZE, ttl=CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
 
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            expires, value = self._entries.pop(key)
+            if expires is not None and expires <= time.time():
+                raise KeyError(key)
+            self._entries[key] = (expires, value)
+        return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        expires = time.time() + ttl if ttl else None
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (expires, value)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, scope):
+        """ Drop all entries for scope
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if key[0] == scope:
+                    del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_CACHED_COMMANDS = CommandCache()
+
+
+def get_scope(connection):
+    return getattr(connection, 'socket_path', None) or id(connection)
+
+
+def get_ttl(command):
+    for prefix, ttl in iteritems(COMMAND_TTL):
+        if command.startswith(prefix):
+            return ttl
+
+
+def cached(connection, command, load, ttl=None):
+    """ Returns the output of command for the connection from the command
+    cache, calling load(connection) to produce it on a miss
+    """
+    key = (get_scope(connection), command)
+    try:
+        return _CACHED_COMMANDS.get(key)
+    except KeyError:
+        out = load(connection)
+        _CACHED_COMMANDS.set(key, out, ttl if ttl is not None else get_ttl(command))
+        return out
+
+
+def invalidate(connection):
+    """ Drops all cached output for the connection
+    """
+    _CACHED_COMMANDS.invalidate(get_scope(connection))
+
+
+def apply(connection, commands, check_mode=False, batch_size=None, progress=None):
+    """ Loads commands onto the device and returns a module style result
+
+    With batch_size the commands are pushed in batches of at most
+    batch_size commands, split at context boundaries, into a single
+    configuration session which is committed once all batches are loaded.
+    A failed batch aborts the session so no batch is ever committed on its
+    own.  progress, when set, is called with (batch number, number of
+    batches) after every batch is loaded.
+    """
+    result = {'changed': False, 'commands': commands}
+    if commands:
+        if batch_size:
+            result['batches'] = len(split_commands(commands, batch_size))
+        resp = load_config(connection, commands, not check_mode,
+                           batch_size or CONFIG_CHUNK_SIZE, progress)
+        if resp.get('diff'):
+            result['changed'] = True
+            result['diff'] = {'prepared': resp['diff']}
+    return result
+
+
+def get_sessions(connection):
+    """ Returns the configuration sessions on the device keyed by name
+    """
+    return run_commands(connection, ['show configuration sessions | json'])[0].get('sessions') or {}
+
+
+def session_age(name, now=None):
+    """ Returns the age in seconds of a session created by ansible or None
+    for any other session
+
+    The unit of the timestamp in the name is told apart by its digit count,
+    names with any other number of digits are not guessed at.
+    """
+    match = SESSION_NAME_RE.match(name)
+    if match:
+        created = int(match.group(1))
+        if len(match.group(1)) == 13:
+            created = created / 1000.0
+        return (now or time.time()) - created
+
+
+def clear_sessions(connection, name=None, states=None, older_than=None, check_mode=False):
+    """ Removes the configuration sessions that match all of the filters
+
+    :param name: regular expression the session name must match
+    :param states: list of session states to remove, for instance pending
+    :param older_than: only remove sessions created by ansible more than
+        older_than seconds ago, EOS does not report the age of a session so
+        it is read from the ansible_<seconds> or ansible_<milliseconds>
+        session name and other sessions never match
+    :param check_mode: return the matching sessions without removing them
+
+    Sessions currently opened by a CLI user cannot be removed and are
+    skipped.  All matching sessions are removed in one batch of commands.
+    Returns the sorted list of removed session names.
+    """
+    pattern = re.compile(name) if name else None
+    now = time.time()
+
+    matches = list()
+    for session, values in sorted(get_sessions(connection).items()):
+        if values.get('instances'):
+            continue
+        if pattern and not pattern.search(session):
+            continue
+        if states and values.get('state') not in states:
+            continue
+        if older_than is not None:
+            age = session_age(session, now)
+            if age is None or age < older_than:
+                continue
+        matches.append(session)
+
+    if matches and not check_mode:
+        run_commands(connection, ['no configure session %s' % session for session in matches])
+
+    return matches
+
+
+@total_ordering
+class Version(object):
+    """ Comparable EOS release version
+
+    The numeric components of the release string are compared in order so
+    4.20.1F is greater than 4.9.3 and equal to 4.20.1.  Versions compare
+    with other Version objects or with version strings.
+    """
+
+    def __init__(self, version):
+        self.string = version
+        self.parts = tuple(int(part) for part in re.findall(r'^\d+|(?<=\.)\d+', version))
+
+    @classmethod
+    def coerce(cls, other):
+        return other if isinstance(other, cls) else cls(other)
+
+    def __eq__(self, other):
+        return self.parts == self.coerce(other).parts
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __lt__(self, other):
+        return self.parts < self.coerce(other).parts
+
+    def __hash__(self):
+        return hash(self.parts)
+
+    def __repr__(self):
+        return 'Version(%r)' % self.string
+
+    def __str__(self):
+        return self.string
+
+    @property
+    def major(self):
+        return self.parts[0] if self.parts else 0
+
+    @property
+    def minor(self):
+        return self.parts[1] if len(self.parts) > 1 else 0
+
+
+def _capabilities_path(key):
+    return os.path.join(CAPABILITIES_CACHE_DIR, hashlib.sha1(to_bytes(key)).hexdigest() + '.json')
+
+
+def _read_capabilities(key):
+    try:
+        with open(_capabilities_path(key)) as f:
+            data = json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+    if time.time() - data.get('timestamp', 0) > CAPABILITIES_TTL:
+        return None
+    return data.get('capabilities')
+
+
+def _prune_capabilities():
+    """ Removes the cache files that expired
+    """
+    now = time.time()
+    for name in os.listdir(CAPABILITIES_CACHE_DIR):
+        path = os.path.join(CAPABILITIES_CACHE_DIR, name)
+        try:
+            if now - os.path.getmtime(path) > CAPABILITIES_TTL:
+                os.remove(path)
+        except (IOError, OSError):
+            pass
+
+
+def _write_capabilities(key, capabilities):
+    try:
+        if not os.path.isdir(CAPABILITIES_CACHE_DIR):
+            os.makedirs(CAPABILITIES_CACHE_DIR)
+        _prune_capabilities()
+        fd, tmp = tempfile.mkstemp(dir=CAPABILITIES_CACHE_DIR)
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'timestamp': time.time(), 'capabilities': capabilities}, f)
+        os.rename(tmp, _capabilities_path(key))
+    except (IOError, OSError):
+        # the cache is an optimization, failing to write it is not an error
+        pass
+
+
+def _capabilities_key(connection):
+    """ Returns the host and port of the device the connection is to
+
+    The socket_path of a network_cli connection changes with every
+    ansible-playbook run so it is only used when the persistent connection
+    does not report its host.
+    """
+    if isinstance(connection, EapiConnection):
+        return '%s:%s' % (connection.host, connection.port)
+    try:
+        return '%s:%s' % (connection.get_option('host'), connection.get_option('port'))
+    except (AttributeError, ConnectionError):
+        return getattr(connection, 'socket_path', None)
+
+
+def get_capabilities(connection, refresh=False):
+    """ Returns the device capabilities
+
+    Capabilities are cached by device host and port in process and in a
+    local file cache shared by all modules and plays run against the device,
+    so the device is asked at most once per CAPABILITIES_TTL.  Expired cache
+    files are removed whenever the cache is written.  Set refresh to bypass
+    both caches.
+    """
+    key = _capabilities_key(connection)
+    if not key:
+        return json.loads(connection.get_capabilities())
+
+    capabilities = None
+    if not refresh:
+        capabilities = _CAPABILITIES.get(key) or _read_capabilities(key)
+
+    if capabilities is None:
+        capabilities = json.loads(connection.get_capabilities())
+        _write_capabilities(key, capabilities)
+
+    _CAPABILITIES[key] = capabilities
+    return capabilities
+
+
+def get_version(connection):
+    return Version(get_capabilities(connection)['device_info']['network_os_version'])
+
+
+def get_features(connection):
+    """ Returns a dict of feature name to True if the device supports it
+    """
+    version = get_version(connection)
+    return dict((name, version >= minimum) for name, minimum in FEATURES.items())
+
+
+def supports(connection, feature):
+    return get_version(connection) >= FEATURES[feature]
+
+
+def check_version(connection, maj_version=None, min_version=None):
+    """ True if the device runs at least release maj_version.min_version
+    """
+    return get_version(connection) >= Version('%s.%s' % (maj_version or 0, min_version or 0))
@@ -0,0 +1,96 @@
+import time
+
+from multiprocessing.pool import ThreadPool
+
+from ansible.module_utils._text import to_text
+
+
+DEFAULT_CONCURRENCY = 10
+POLL_INTERVAL = 0.1
+
+
+class Executor(object):
+    """ Runs a function against many devices concurrently
+
+    Each device is handled by a worker thread from a pool sized by
+    concurrency.  A device that does not return within timeout seconds of
+    its worker starting is reported as failed.  Python threads cannot be
+    interrupted so the worker keeps running in the background and the
+    connection timeout is what ultimately bounds it.
+    """
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, timeout=None):
+        self.concurrency = concurrency
+        self.timeout = timeout
+
+    def run(self, func, targets):
+        """ Calls func(target) for every target
+
+        Returns one dict per target, in target order, with either the value
+        returned by func under ``result`` or ``failed`` and ``msg``.
+        """
+        targets = list(targets)
+        if not targets:
+            return []
+
+        started = dict()
+
+        def call(index):
+            started[index] = time.time()
+            return func(targets[index])
+
+        pool = ThreadPool(max(1, min(self.concurrency, len(targets))))
+        try:
+            jobs = [pool.apply_async(call, (index,)) for index in range(len(targets))]
+            results = [None] * len(targets)
+            pending = list(range(len(targets)))
+
+            while pending:
+                jobs[pending[0]].wait(POLL_INTERVAL)
+                for index in list(pending):
+                    job = jobs[index]
+                    if job.ready():
+                        try:
+                            results[index] = {'failed': False, 'result': job.get()}
+                        except Exception as exc:
+                            results[index] = {'failed': True, 'msg': to_text(exc)}
+                    elif self.timeout and index in started and time.time() - started[index] > self.timeout:
+                        results[index] = {'failed': True, 'msg': 'timeout after %s seconds' % self.timeout}
+                    else:
+                        continue
+                    pending.remove(index)
+        finally:
+            # workers are daemon threads, do not wait on any that timed out
+            pool.close()
+
+        return results
+
+
+def run_devices(module, devices, func):
+    """ Calls func(device) for every device concurrently and exits the module
+
+    The pool is sized by the module concurrency and timeout options.  func
+    returns a module style result for the device which is reported under
+    ``results`` with the device host.  The module fails listing the hosts
+    that failed, if any.
+    """
+    executor = Executor(module.params['concurrency'], module.params['timeout'])
+
+    results = list()
+    for device, outcome in zip(devices, executor.run(func, devices)):
+        result = {'host': device['host'], 'failed': outcome['failed']}
+        if outcome['failed']:
+            result['msg'] = outcome['msg']
+        else:
+            result.update(outcome['result'])
+            if not module._diff:
+                result.pop('diff', None)
+        results.append(result)
+
+    changed = any(result.get('changed') for result in results)
+    failed = [result['host'] for result in results if result['failed']]
+    if failed:
+        module.fail_json(msg='failed on %s' % ', '.join(failed),
+                         changed=changed, results=results)
+
+    module.exit_json(changed=changed, results=results)
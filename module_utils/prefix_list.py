@@ -0,0 +1,163 @@
+import re
+
+from ansible.module_utils.config import get_prefix_list
+from ansible.module_utils.prefix_tree import Entry, optimize
+
+PREFIX_RE = re.compile(r'^[0-9a-fA-F:.]+/\d{1,3}$')
+
+ENTRY_KEYS = ('seqno', 'rule', 'prefix', 'ge', 'le', 'eq')
+
+
+def render_entry(entry):
+    """ Renders a prefix list entry into its configuration line
+    """
+    config = ['seq %s' % entry['seqno'], entry['rule'], entry['prefix']]
+
+    if entry.get('eq'):
+        config.append('eq %s' % entry['eq'])
+    else:
+        if entry.get('ge'):
+            config.append('ge %s' % entry['ge'])
+        if entry.get('le'):
+            config.append('le %s' % entry['le'])
+
+    return ' '.join(config)
+
+
+def parse_entries(lines):
+    """ Indexes prefix list entry lines by sequence number
+    """
+    entries = dict()
+    for line in lines:
+        if line.startswith('seq '):
+            entries[int(line.split(' ', 2)[1])] = line
+    return entries
+
+
+def diff_entries(have, want, replace=False):
+    """ Returns the commands needed to converge have into want
+
+    :param have: dict of existing entry lines keyed by sequence number
+    :param want: iterable of (seqno, line) tuples of the desired entries
+    :param replace: remove existing entries not found in want
+    """
+    commands = list()
+    seen = set()
+
+    for seqno, line in want:
+        seen.add(seqno)
+        current = have.get(seqno)
+        if current == line:
+            continue
+        if current is not None:
+            commands.append('no seq %s' % seqno)
+        commands.append(line)
+
+    if replace:
+        removes = ['no seq %s' % seqno for seqno in sorted(have) if seqno not in seen]
+        commands[0:0] = removes
+
+    return commands
+
+
+def validate_entry(entry):
+    """ Validates and normalizes a prefix list entry dict
+    """
+    try:
+        entry['seqno'] = int(entry['seqno'])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError('invalid or missing seqno')
+
+    entry['rule'] = entry.get('rule') or 'permit'
+    if entry['rule'] not in ('permit', 'deny'):
+        raise ValueError('rule must be one of permit or deny')
+
+    if not PREFIX_RE.match(entry.get('prefix') or ''):
+        raise ValueError('invalid prefix %s' % entry.get('prefix'))
+
+    for key in ('ge', 'le', 'eq'):
+        value = entry.get(key)
+        if value in (None, ''):
+            entry[key] = None
+        elif not str(value).isdigit():
+            raise ValueError('%s must be an integer' % key)
+
+    return entry
+
+
+def parse_entry(line):
+    """ Parses a single prefix list entry from a line of text
+
+    The line is either the device syntax (``seq 10 permit 10.0.0.0/8 le 24``)
+    or comma separated values in the order seqno, rule, prefix, ge, le, eq.
+    """
+    if line.startswith('seq '):
+        words = line.split()
+        if len(words) < 4:
+            raise ValueError('expected seq <seqno> <rule> <prefix>')
+        entry = dict(seqno=words[1], rule=words[2], prefix=words[3])
+        options = words[4:]
+        if len(options) % 2:
+            raise ValueError('missing value for %s' % options[-1])
+        for key, value in zip(options[::2], options[1::2]):
+            if key not in ('ge', 'le', 'eq'):
+                raise ValueError('unknown keyword %s' % key)
+            entry[key] = value
+    else:
+        fields = [field.strip() for field in line.split(',')]
+        if not 3 <= len(fields) <= len(ENTRY_KEYS):
+            raise ValueError('expected between 3 and %s fields' % len(ENTRY_KEYS))
+        entry = dict(zip(ENTRY_KEYS, fields))
+
+    return validate_entry(entry)
+
+
+def load_entries(path):
+    """ Lazily reads prefix list entries from a file
+
+    Yields validated entry dicts one at a time so the source file is never
+    held in memory.  Blank lines and lines starting with ``#`` or ``!`` are
+    skipped.
+    """
+    with open(path) as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line[0] in '#!':
+                continue
+            try:
+                entry = parse_entry(line)
+            except ValueError as exc:
+                raise ValueError('%s line %s: %s' % (path, lineno, exc))
+            yield entry
+
+
+def prefix_list_commands(connection, objs):
+    """ Returns the commands to converge a list of prefix lists
+    """
+    commands = list()
+
+    for obj in objs:
+        have = get_prefix_list(connection, obj['name'])
+
+        if obj['state'] == 'absent':
+            if have:
+                commands.append('no ip prefix-list %s' % obj['name'])
+            continue
+
+        if obj.get('src'):
+            entries = load_entries(obj['src'])
+        else:
+            entries = obj['entries'] or []
+
+        if obj.get('optimize'):
+            entries = [e.to_dict() for e in optimize(Entry.from_dict(e) for e in entries)]
+
+        want = ((item['seqno'], render_entry(item)) for item in entries)
+        updates = diff_entries(parse_entries(have), want, obj['replace'])
+
+        if updates:
+            commands.append('ip prefix-list %s' % obj['name'])
+            commands.extend(updates)
+            commands.append('exit')
+
+    return commands
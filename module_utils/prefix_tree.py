@@ -0,0 +1,227 @@
+import socket
+import binascii
+
+
+FAMILIES = {
+    4: (socket.AF_INET, 32),
+    6: (socket.AF_INET6, 128),
+}
+
+
+def parse_prefix(prefix):
+    """ Returns the (address bits, network value, length) for the prefix
+    """
+    address, length = prefix.split('/')
+    family = 6 if ':' in address else 4
+    af, bits = FAMILIES[family]
+
+    length = int(length)
+    if not 0 <= length <= bits:
+        raise ValueError('invalid prefix length %s' % prefix)
+
+    try:
+        value = int(binascii.hexlify(socket.inet_pton(af, address)), 16)
+    except (socket.error, ValueError):
+        raise ValueError('invalid prefix %s' % prefix)
+    value &= ((1 << bits) - 1) ^ ((1 << (bits - length)) - 1)
+
+    return bits, value, length
+
+
+def format_prefix(bits, value, length):
+    af = FAMILIES[4 if bits == 32 else 6][0]
+    packed = binascii.unhexlify('%0*x' % (bits // 4, value))
+    return '%s/%s' % (socket.inet_ntop(af, packed), length)
+
+
+class Entry(object):
+    """ A prefix list entry with its ge/le/eq values expressed as the range
+    of prefix lengths [lo, hi] it matches
+    """
+
+    __slots__ = ('seqno', 'rule', 'bits', 'value', 'length', 'lo', 'hi')
+
+    def __init__(self, seqno, rule, bits, value, length, lo, hi):
+        self.seqno = seqno
+        self.rule = rule
+        self.bits = bits
+        self.value = value
+        self.length = length
+        self.lo = lo
+        self.hi = hi
+
+    @classmethod
+    def from_dict(cls, entry):
+        bits, value, length = parse_prefix(entry['prefix'])
+        lo = hi = length
+        if entry.get('eq'):
+            lo = hi = int(entry['eq'])
+        else:
+            if entry.get('ge'):
+                lo, hi = int(entry['ge']), bits
+            if entry.get('le'):
+                hi = int(entry['le'])
+        return cls(int(entry['seqno']), entry['rule'], bits, value, length, lo, hi)
+
+    def covers(self, other):
+        """ True if every prefix matched by other is also matched by self
+
+        The caller is expected to have checked that the prefix of self
+        contains the prefix of other.
+        """
+        return self.lo <= other.lo and other.hi <= self.hi
+
+    def to_dict(self):
+        entry = dict(seqno=self.seqno, rule=self.rule, ge=None, le=None, eq=None,
+                     prefix=format_prefix(self.bits, self.value, self.length))
+        if self.lo == self.hi:
+            if self.lo != self.length:
+                entry['eq'] = self.lo
+        else:
+            if self.lo > self.length:
+                entry['ge'] = self.lo
+            if self.hi < self.bits or self.lo == self.length:
+                entry['le'] = self.hi
+        return entry
+
+
+class PrefixTree(object):
+    """ Binary radix tree of prefix list entries for one address family
+
+    Nodes are stored in parallel arrays indexed by node id rather than as
+    node objects.  Node 0 is the root and a child id of 0 means no child.
+    """
+
+    __slots__ = ('bits', '_zero', '_one', '_entries')
+
+    def __init__(self, bits):
+        self.bits = bits
+        self._zero = [0]
+        self._one = [0]
+        self._entries = [None]
+
+    def _bit(self, value, depth):
+        return (value >> (self.bits - depth - 1)) & 1
+
+    def _child(self, node, bit, create=False):
+        children = self._one if bit else self._zero
+        child = children[node]
+        if not child and create:
+            child = len(self._entries)
+            self._zero.append(0)
+            self._one.append(0)
+            self._entries.append(None)
+            children[node] = child
+        return child
+
+    def insert(self, entry):
+        node = 0
+        for depth in range(entry.length):
+            node = self._child(node, self._bit(entry.value, depth), create=True)
+        if self._entries[node] is None:
+            self._entries[node] = [entry]
+        else:
+            self._entries[node].append(entry)
+
+    def covering(self, entry):
+        """ Yields the entries whose prefix contains the entry prefix
+        """
+        node = 0
+        for depth in range(entry.length + 1):
+            for item in self._entries[node] or ():
+                yield item
+            if depth == entry.length:
+                break
+            node = self._child(node, self._bit(entry.value, depth))
+            if not node:
+                break
+
+    def aggregate(self):
+        """ Merges sibling entries matching the same length range into their
+        parent prefix, working up from the longest prefixes.
+
+        All entries in the tree must share the same rule.
+        """
+        order = list()
+        stack = [(0, 0, 0)]
+        while stack:
+            node, depth, value = stack.pop()
+            order.append((node, depth, value))
+            for bit, children in ((0, self._zero), (1, self._one)):
+                child = children[node]
+                if child:
+                    stack.append((child, depth + 1, value | (bit << (self.bits - depth - 1))))
+
+        for node, depth, value in reversed(order):
+            zero, one = self._zero[node], self._one[node]
+            if not (zero and one and self._entries[zero] and self._entries[one]):
+                continue
+            others = dict(((e.lo, e.hi), e) for e in self._entries[one])
+            for entry in list(self._entries[zero]):
+                sibling = others.get((entry.lo, entry.hi))
+                if sibling is None:
+                    continue
+                self._entries[zero].remove(entry)
+                self._entries[one].remove(sibling)
+                merged = Entry(min(entry.seqno, sibling.seqno), entry.rule, self.bits,
+                               value, depth, entry.lo, entry.hi)
+                if self._entries[node] is None:
+                    self._entries[node] = [merged]
+                else:
+                    self._entries[node].append(merged)
+
+    def entries(self):
+        for items in self._entries:
+            for entry in items or ():
+                yield entry
+
+
+def find_shadowed(entries):
+    """ Returns (entry, shadowed_by) tuples for entries that can never match
+
+    An entry is shadowed when an entry with a lower sequence number matches
+    every prefix it matches.  If both entries have the same rule the entry
+    is redundant, otherwise it is dead policy.
+    """
+    trees = dict()
+    shadowed = list()
+    for entry in sorted(entries, key=lambda x: x.seqno):
+        tree = trees.setdefault(entry.bits, PrefixTree(entry.bits))
+        for item in tree.covering(entry):
+            if item.covers(entry):
+                shadowed.append((entry, item))
+                break
+        else:
+            tree.insert(entry)
+    return shadowed
+
+
+def optimize(entries):
+    """ Compacts a list of prefix list entries
+
+    Shadowed entries are dropped and adjacent prefixes are aggregated
+    within each run of consecutive entries that share the same rule, so
+    the first match result for any prefix is unchanged.  Returns the new
+    list of entries sorted by sequence number.
+    """
+    entries = sorted(entries, key=lambda x: x.seqno)
+    dropped = set(id(entry) for entry, _ in find_shadowed(entries))
+
+    runs = list()
+    for entry in entries:
+        if id(entry) in dropped:
+            continue
+        if not runs or runs[-1][0] != entry.rule:
+            runs.append((entry.rule, dict()))
+        tree = runs[-1][1].setdefault(entry.bits, PrefixTree(entry.bits))
+        tree.insert(entry)
+
+    optimized = list()
+    for rule, trees in runs:
+        for tree in trees.values():
+            tree.aggregate()
+            optimized.extend(tree.entries())
+
+    # aggregation can produce prefixes covering later entries of the run
+    dropped = set(id(entry) for entry, _ in find_shadowed(optimized))
+    return sorted((e for e in optimized if id(e) not in dropped), key=lambda x: x.seqno)
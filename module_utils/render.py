@@ -0,0 +1,157 @@
+import json
+import uuid
+
+from multiprocessing import Pool
+
+from ansible.module_utils.six import string_types
+from ansible.module_utils.connection import ConnectionError
+from ansible.module_utils.eos import invalidate
+from ansible.module_utils.bgp import bgp_commands, peer_groups_commands
+from ansible.module_utils.bgp import redistribution_commands, address_family_commands
+from ansible.module_utils.prefix_list import prefix_list_commands
+from ansible.module_utils.route_map import route_map_commands
+
+
+PEER_GROUP_DEFAULTS = dict(
+    remote_as=None, maximum_routes=None, next_hop_unchanged=None, update_source=None,
+    ebgp_multihop=None, send_community_extended=None, neighbors=None, replace=None,
+    negate_on_none=None, state='present'
+)
+
+PREFIX_LIST_DEFAULTS = dict(entries=None, src=None, optimize=False, replace=False, state='present')
+
+PREFIX_LIST_ENTRY_DEFAULTS = dict(rule='permit', ge=None, le=None, eq=None)
+
+ROUTE_MAP_ENTRY_DEFAULTS = {
+    'rule': 'permit', 'description': None, 'include_route_map': None, 'continue': None,
+    'continue_seqno': None, 'match_ip_address_prefix_list': None,
+    'match_ip_address_access_list': None, 'set_tag': None
+}
+
+
+class SnapshotConnection(object):
+    """ Read only connection backed by a saved running-config
+
+    The snapshot is the output of ``show running-config | json`` either as
+    the JSON text saved from the device or the decoded dict.  Only the
+    running-config can be read from it and nothing can be loaded onto it.
+
+    Every instance gets a unique socket_path so the command cache never
+    serves the parsed config of one snapshot to another.
+    """
+
+    def __init__(self, snapshot=None, name=None):
+        if snapshot is None:
+            snapshot = {'cmds': {}}
+        if not isinstance(snapshot, string_types):
+            snapshot = json.dumps(snapshot)
+        self._snapshot = snapshot
+        self.socket_path = 'snapshot://%s/%s' % (name or 'snapshot', uuid.uuid4().hex)
+
+    def get(self, command):
+        if command == 'show running-config | json':
+            return self._snapshot
+        raise ConnectionError('%s is not available from a config snapshot' % command)
+
+    def load_config(self, commands, commit=True):
+        raise ConnectionError('config cannot be loaded onto a config snapshot')
+
+
+def _defaults(params, defaults):
+    obj = dict(defaults)
+    obj.update((k, v) for k, v in params.items() if v is not None)
+    return obj
+
+
+def _aggregate(params, defaults, local=()):
+    items = params.get('aggregate')
+    if not items:
+        return [_defaults(params, defaults)]
+
+    # aggregate items inherit the top level arguments except the local ones
+    base = _defaults(params, defaults)
+    for key in local:
+        base[key] = defaults.get(key)
+    return [_defaults(item, base) for item in items]
+
+
+def _bgp(connection, params):
+    defaults = dict(router_id=None, maximum_paths=None, state='present')
+    return bgp_commands(connection, _defaults(params, defaults))
+
+
+def _peer_group(connection, params):
+    return peer_groups_commands(connection, _aggregate(params, PEER_GROUP_DEFAULTS))
+
+
+def _redistribution(connection, params):
+    return redistribution_commands(connection, _defaults(params, dict(route_map=None, state='present')))
+
+
+def _address_family(connection, params):
+    defaults = dict(neighbors=None, replace=None, state='present')
+    params = _defaults(params, defaults)
+    params['neighbors'] = [_defaults(n, dict(activate=None)) for n in params['neighbors'] or []]
+    return address_family_commands(connection, params)
+
+
+def _prefix_list(connection, params):
+    objs = _aggregate(params, PREFIX_LIST_DEFAULTS, local=('src',))
+    for obj in objs:
+        if obj['entries']:
+            obj['entries'] = [_defaults(e, PREFIX_LIST_ENTRY_DEFAULTS) for e in obj['entries']]
+    return prefix_list_commands(connection, objs)
+
+
+def _route_map(connection, params):
+    params = _defaults(params, dict(entries=None, replace=False, state='present'))
+    params['entries'] = [_defaults(e, ROUTE_MAP_ENTRY_DEFAULTS) for e in params['entries'] or []]
+    return route_map_commands(connection, params)
+
+
+BUILDERS = {
+    'eos_bgp': _bgp,
+    'eos_bgp_peer_group': _peer_group,
+    'eos_bgp_redistribution': _redistribution,
+    'eos_bgp_address_family': _address_family,
+    'eos_prefix_list': _prefix_list,
+    'eos_route_map': _route_map,
+}
+
+
+def render(module, params, snapshot=None):
+    """ Returns the commands a module would send to a device
+
+    :param module: the name of the module, for instance eos_prefix_list
+    :param params: the module arguments, unset arguments use the module
+        defaults
+    :param snapshot: the device ``show running-config | json`` output used
+        as the current configuration, an empty configuration if not set
+    """
+    try:
+        builder = BUILDERS[module]
+    except KeyError:
+        raise ValueError('unable to render commands for module %s' % module)
+    connection = SnapshotConnection(snapshot)
+    try:
+        return builder(connection, params)
+    finally:
+        invalidate(connection)
+
+
+def _render_job(job):
+    return render(*job)
+
+
+def render_many(jobs, processes=None, chunksize=16):
+    """ Renders many (module, params, snapshot) jobs in parallel
+
+    Rendering is CPU bound so jobs are spread across worker processes.
+    Returns the list of commands for each job in the order of jobs.
+    """
+    pool = Pool(processes)
+    try:
+        return pool.map(_render_job, jobs, chunksize)
+    finally:
+        pool.close()
+        pool.join()
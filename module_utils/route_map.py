@@ -0,0 +1,102 @@
+from ansible.module_utils.config import get_route_map
+
+
+def render_entry(entry):
+    """ Renders the configuration lines of a route-map entry
+    """
+    commands = list()
+
+    if entry['continue'] is not None and entry['continue_seqno'] is not None:
+        raise ValueError('`continue` and `continue_seqno` are mutually exclusive')
+
+    if entry['description']:
+        commands.append('description %s' % entry['description'])
+
+    if entry['include_route_map']:
+        commands.append('sub-route-map %s' % entry['include_route_map'])
+
+    if entry['continue']:
+        commands.append('continue')
+    elif entry['continue_seqno'] is not None:
+        commands.append('continue %s' % entry['continue_seqno'])
+
+    if entry['match_ip_address_prefix_list']:
+        commands.append('match ip address prefix-list %s' % entry['match_ip_address_prefix_list'])
+
+    if entry['match_ip_address_access_list']:
+        commands.append('match ip address access-list %s' % entry['match_ip_address_access_list'])
+
+    if entry['set_tag']:
+        commands.append('set tag %s' % entry['set_tag'])
+
+    return commands
+
+
+def diff_entries(name, have, want, replace=False):
+    """ Returns the commands needed to converge the route-map entries
+
+    :param name: the name of the route-map
+    :param have: dict of (rule, lines) tuples keyed by sequence number
+    :param want: iterable of (seqno, rule, lines) tuples
+    :param replace: remove entries and entry lines not found in want
+    """
+    commands = list()
+    seen = set()
+
+    for seqno, rule, lines in want:
+        seen.add(seqno)
+        header = 'route-map %s %s %s' % (name, rule, seqno)
+
+        try:
+            current_rule, current = have[seqno]
+        except KeyError:
+            commands.append(header)
+            commands.extend(lines)
+            continue
+
+        if current_rule != rule:
+            commands.append('no route-map %s %s %s' % (name, current_rule, seqno))
+            commands.append(header)
+            commands.extend(lines)
+            continue
+
+        existing = set(current)
+        updates = [line for line in lines if line not in existing]
+
+        if replace:
+            desired = set(lines)
+            updates[0:0] = ['no %s' % line for line in current if line not in desired]
+
+        if updates:
+            commands.append(header)
+            commands.extend(updates)
+
+    if replace:
+        for seqno in sorted(have):
+            if seqno not in seen:
+                commands.append('no route-map %s %s %s' % (name, have[seqno][0], seqno))
+
+    return commands
+
+
+def route_map_commands(connection, params):
+    """ Returns the commands to converge a route-map
+    """
+    name = params['name']
+    have = get_route_map(connection, name)
+
+    if params['state'] == 'absent':
+        return ['no route-map %s' % name] if have else []
+
+    want = [(entry['seqno'], entry['rule'], render_entry(entry))
+            for entry in params['entries'] or []]
+
+    seqnos = [seqno for seqno, rule, lines in want]
+    if len(seqnos) != len(set(seqnos)):
+        raise ValueError('route-map entries must have unique sequence numbers')
+
+    commands = diff_entries(name, have, want, params['replace'])
+    if commands:
+        commands.append('exit')
+
+    return commands
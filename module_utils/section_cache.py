@@ -0,0 +1,162 @@
+import os
+import re
+import json
+import hashlib
+import tempfile
+
+from ansible.module_utils._text import to_bytes, to_text
+from ansible.module_utils.config import RunningConfig, parse
+from ansible.module_utils.eos import run_commands
+
+
+# top level configuration lines, comments start with !
+SECTION_RE = re.compile(r'^[^ !\r\n]', re.M)
+
+
+def split_sections(text):
+    """ Splits the text configuration into its top level sections
+
+    Yields (line, text) tuples where text holds the top level line and all
+    of the lines after it up to the next top level line.  The section starts
+    are found with a single regex scan so this is much cheaper than parsing
+    the configuration.
+    """
+    starts = [match.start() for match in SECTION_RE.finditer(text)]
+    for start, end in zip(starts, starts[1:] + [len(text)]):
+        block = text[start:end]
+        line = block.split('\n', 1)[0].rstrip()
+        if line != 'end':
+            yield line, block
+
+
+def digest(text):
+    return hashlib.sha1(to_bytes(text)).hexdigest()
+
+
+# a block of sections ends after a section whose digest is a multiple of
+# BLOCK_SPLIT, about one in BLOCK_SPLIT sections, so block boundaries
+# depend on the content and not on the position of the sections
+BLOCK_SPLIT = 64
+
+
+def split_blocks(sections):
+    """ Groups (line, text, digest) section tuples into blocks
+
+    Yields (digest, sections) tuples where digest identifies the text of
+    all of the sections in the block.
+    """
+    block = []
+    for section in sections:
+        block.append(section)
+        if int(section[2][:8], 16) % BLOCK_SPLIT == 0:
+            yield digest(''.join(item[2] for item in block)), block
+            block = []
+    if block:
+        yield digest(''.join(item[2] for item in block)), block
+
+
+def get_sections(connection, sections):
+    """ Returns the text of each named top level section of the running
+    configuration, retrieved in a single batch of commands
+    """
+    commands = ['show running-config section %s' % name for name in sections]
+    return [to_text(text) for text in run_commands(connection, commands)]
+
+
+class SectionCache(object):
+    """ Parsed configuration cached between runs
+
+    The cache is stored in a local JSON file, one file per device.  A
+    configuration identical to the previous run is read back from the file
+    without being split or parsed.  Otherwise the top level sections are
+    grouped into blocks of about BLOCK_SPLIT sections and only the blocks
+    whose text changed are parsed again.  ``changed`` and ``removed`` list
+    the sections that differ from the previous run.
+
+    Parsing a block is cheap, caching every section on its own costs more
+    in hashing and JSON than parsing the whole configuration again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.changed = []
+        self.removed = []
+        self._data = {'digest': None, 'lines': {}, 'blocks': {}, 'sections': {}}
+        self._dirty = False
+
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+                for key in self._data:
+                    self._data[key] = data.get(key) or self._data[key]
+            except (IOError, ValueError):
+                # an unreadable cache is rebuilt from scratch
+                self._dirty = True
+
+    def from_text(self, text):
+        """ Returns the RunningConfig for the full text configuration
+        """
+        value = digest(text)
+        blocks = self._data['blocks']
+
+        if value == self._data['digest']:
+            cmds = dict()
+            for block in blocks.values():
+                cmds.update(block)
+            return RunningConfig(cmds)
+
+        lines = dict()
+        sections = list()
+        for line, block in split_sections(text):
+            lines[line] = digest(block)
+            sections.append((line, block, lines[line]))
+
+        previous = self._data['lines']
+        self.changed = [line for line, hashed in lines.items() if previous.get(line) != hashed]
+        self.removed = sorted(set(previous) - set(lines))
+
+        cmds = dict()
+        current = dict()
+        for key, block in split_blocks(sections):
+            if key not in blocks:
+                blocks[key] = parse(''.join(item[1] for item in block))
+            current[key] = blocks[key]
+            cmds.update(current[key])
+
+        self._data.update(digest=value, lines=lines, blocks=current)
+        self._dirty = True
+        return RunningConfig(cmds)
+
+    def fetch(self, connection, sections):
+        """ Returns the RunningConfig holding only the named sections
+
+        Each section is retrieved with ``show running-config section`` in a
+        single batch of commands.
+        """
+        cmds = dict()
+        for name, text in zip(sections, get_sections(connection, sections)):
+            value = digest(text)
+            entry = self._data['sections'].get(name)
+            if not entry or entry['hash'] != value:
+                entry = self._data['sections'][name] = {'hash': value, 'cmds': parse(text)}
+                self.changed.append(name)
+                self._dirty = True
+            cmds.update(entry['cmds'])
+        return RunningConfig(cmds)
+
+    def save(self):
+        """ Writes the cache file if the configuration changed
+        """
+        if not self._dirty:
+            return
+
+        dirname = os.path.dirname(os.path.abspath(self.path))
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname)
+
+        fd, tmp = tempfile.mkstemp(dir=dirname)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self._data, f)
+        os.rename(tmp, self.path)
+        self._dirty = False